@@ -0,0 +1,628 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.14"
+# dependencies = [
+#   "structlog>=24.0.0",
+#   "PyYAML>=6.0.0",
+#   "Pillow>=10.3.0",
+# ]
+# ///
+"""Benchmark the ci/ scripts against synthetic content trees.
+
+Two parts:
+- `generate` writes a synthetic `content/tools/<lang>/<slug>/index.md` tree,
+  optionally with a scripted git history and sample images.
+- `run` generates trees of several sizes and records wall time and peak
+  (traced) memory for `build_tools_yaml`, `convert_bundles`,
+  `load_yaml_entries`, `summarize_changes` and `compare_tools_yaml`. Results are written as JSON so
+  runs from different commits can be diffed with `compare`.
+- `startup` fails if importing a script loads a heavy dependency (PyYAML,
+  structlog, Pillow). It also times cold `--help` runs of each script in a
+  fresh interpreter and warns about those over `--budget-ms`; wall time on
+  shared runners is too noisy to fail on.
+
+Examples:
+    uv run ci/benchmark.py generate /tmp/tree --tools 1000 --commits 50 --images 1
+    uv run ci/benchmark.py run --sizes 1000,10000,50000 --commits 200
+    uv run ci/benchmark.py compare .cache/bench/<old>.json .cache/bench/<new>.json
+    uv run ci/benchmark.py startup --budget-ms 150
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Sequence
+
+if TYPE_CHECKING:
+    import structlog
+
+import build_tools_data
+import convert_page_images
+import detect_tools_changes
+from common.deps import require
+from common.log import configure_logging
+
+LANGUAGES = ("html", "python")
+WORDS = (
+    "inspect",
+    "convert",
+    "github",
+    "yaml",
+    "json",
+    "image",
+    "search",
+    "crawl",
+    "metadata",
+    "url",
+    "helm",
+    "mesh",
+    "diff",
+    "token",
+    "browser",
+    "cli",
+)
+
+
+# Scripts checked by `startup`, and the dependencies they must load lazily.
+STARTUP_SCRIPTS = (
+    "build_tools_changelog",
+    "build_tools_data",
+    "convert_page_images",
+    "detect_tools_changes",
+    "pipeline",
+    "validate_front_matter",
+)
+HEAVY_MODULES = ("yaml", "structlog", "PIL")
+
+
+@dataclass(frozen=True)
+class TreeSpec:
+    tools: int
+    commits: int = 0
+    images: int = 0
+    image_size: int = 256
+    body_kb: int = 2
+    seed: int = 0
+
+
+def _tool_paths(spec: TreeSpec) -> list[str]:
+    return [
+        f"{LANGUAGES[idx % len(LANGUAGES)]}/tool-{idx:06d}" for idx in range(spec.tools)
+    ]
+
+
+def _index_md(slug: str, *, revision: int, spec: TreeSpec, rng: random.Random) -> str:
+    language = slug.split("/", 1)[0]
+    tags = rng.sample(WORDS, k=4)
+    lines = [
+        "---",
+        "date: 2025-12-17",
+        "draft: false",
+        f"title: 'Tool {slug} r{revision}'",
+        f"description: 'Synthetic tool to {' and '.join(tags[:2])} things (r{revision}).'",
+        "tags:",
+        *(f"  - {tag}" for tag in tags),
+        "resources:",
+        "  - name: tool-file",
+        f"    src: tool.{'py' if language == 'python' else 'html'}",
+    ]
+    for image in range(spec.images):
+        name = "tool-icon" if image == 0 else f"image-{image}"
+        lines += [f"  - name: {name}", f"    src: images/{name}.png"]
+    lines.append("---")
+    paragraph = " ".join(rng.choices(WORDS, k=12)) + "\n"
+    body = paragraph * max(1, spec.body_kb * 1024 // len(paragraph))
+    return "\n".join(lines) + "\n\n" + body
+
+
+def _png_bytes(size: int, rng: random.Random) -> bytes:
+    pil = require("PIL.Image", package="Pillow", pip_name="pillow")
+    image = pil.frombytes("RGB", (size, size), rng.randbytes(size * size * 3))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _iter_tree_files(
+    spec: TreeSpec, rng: random.Random
+) -> Iterator[tuple[str, bytes, int]]:
+    """Yield (path, bytes, commit) for every file revision in the tree.
+
+    Tools are added across the first half of the commits; the remaining
+    commits each edit a random sample of existing tools.
+    """
+
+    slugs = _tool_paths(spec)
+    commits = max(spec.commits, 1)
+    add_commits = max(commits // 2, 1)
+    per_commit = -(-len(slugs) // add_commits)
+    revisions: dict[str, int] = {}
+    image_cache = [_png_bytes(spec.image_size, rng) for _ in range(min(spec.images, 4))]
+
+    for commit in range(commits):
+        if commit < add_commits:
+            batch = slugs[commit * per_commit : (commit + 1) * per_commit]
+        else:
+            batch = rng.sample(list(revisions), k=min(len(revisions), 10))
+        for slug in batch:
+            revision = revisions.get(slug, -1) + 1
+            revisions[slug] = revision
+            base = f"content/tools/{slug}"
+            text = _index_md(slug, revision=revision, spec=spec, rng=rng)
+            yield f"{base}/index.md", text.encode(), commit
+            if revision == 0:
+                suffix = "py" if slug.startswith("python/") else "html"
+                yield f"{base}/tool.{suffix}", b"<!-- tool -->\n", commit
+                for image in range(spec.images):
+                    name = "tool-icon" if image == 0 else f"image-{image}"
+                    data = image_cache[image % len(image_cache)]
+                    yield f"{base}/images/{name}.png", data, commit
+
+
+def generate_tree(dest: Path, spec: TreeSpec) -> Path:
+    """Create a synthetic repo root at `dest` and return it."""
+
+    rng = random.Random(spec.seed)
+    dest.mkdir(parents=True, exist_ok=True)
+    if spec.commits <= 0:
+        for rel_path, data, _ in _iter_tree_files(spec, rng):
+            path = dest / rel_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+        return dest
+
+    # Stream the scripted history through fast-import, then let git
+    # materialize the worktree; far quicker than thousands of `git commit`s.
+    subprocess.run(["git", "init", "-q", "-b", "main", str(dest)], check=True)
+    importer = subprocess.Popen(
+        ["git", "fast-import", "--quiet"], cwd=dest, stdin=subprocess.PIPE
+    )
+    assert importer.stdin is not None
+    current = -1
+    for rel_path, data, commit in _iter_tree_files(spec, rng):
+        if commit != current:
+            current = commit
+            message = f"synthetic commit {commit}\n".encode()
+            importer.stdin.write(
+                b"commit refs/heads/main\n"
+                + f"committer Bench <bench@example.invalid> {1_700_000_000 + commit * 60} +0000\n".encode()
+                + f"data {len(message)}\n".encode()
+                + message
+            )
+        importer.stdin.write(f"M 100644 inline {rel_path}\ndata {len(data)}\n".encode())
+        importer.stdin.write(data + b"\n")
+    importer.stdin.close()
+    if importer.wait() != 0:
+        raise RuntimeError("git fast-import failed")
+    subprocess.run(["git", "reset", "-q", "--hard"], cwd=dest, check=True)
+    return dest
+
+
+def _measure(
+    fn: Callable[[], Any], *, repeat: int, setup: Callable[[], None] | None = None
+) -> dict[str, Any]:
+    """Time `fn` `repeat` times, then run it once more under tracemalloc."""
+
+    timings: list[float] = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    if setup is not None:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "repeat": repeat,
+        "min_s": round(min(timings), 6),
+        "median_s": round(statistics.median(timings), 6),
+        "peak_traced_mib": round(peak / 2**20, 3),
+    }
+
+
+def _mutate_entries(
+    entries: dict[str, Any], rng: random.Random, *, fraction: float = 0.01
+) -> dict[str, Any]:
+    """Return a copy of `entries` with a few additions, updates and removals."""
+
+    mutated = dict(entries)
+    slugs = sorted(mutated)
+    count = max(1, int(len(slugs) * fraction))
+    for slug in rng.sample(slugs, k=min(count, len(slugs))):
+        mutated[slug] = {**mutated[slug], "description": "changed"}
+    for slug in rng.sample(slugs, k=min(count, len(slugs))):
+        mutated.pop(slug, None)
+    for idx in range(count):
+        mutated[f"html/new-{idx:06d}"] = {"title": "new"}
+    return mutated
+
+
+def _mutate_tool_entries(
+    entries: list[build_tools_data.ToolEntry],
+    rng: random.Random,
+    *,
+    fraction: float = 0.01,
+) -> list[build_tools_data.ToolEntry]:
+    """`_mutate_entries` for rendered entries, to diff two tools.yaml texts."""
+
+    count = max(1, int(len(entries) * fraction))
+    mutated = {entry.slug: entry for entry in entries}
+    slugs = sorted(mutated)
+    for slug in rng.sample(slugs, k=min(count, len(slugs))):
+        mutated[slug] = replace(mutated[slug], description="changed")
+    for slug in rng.sample(slugs, k=min(count, len(slugs))):
+        mutated.pop(slug, None)
+    for idx in range(count):
+        slug = f"html/new-{idx:06d}"
+        mutated[slug] = build_tools_data.ToolEntry(
+            slug, "new", "html", "", "tool.html", None, None, ()
+        )
+    return sorted(mutated.values(), key=lambda e: e.slug)
+
+
+def _bench_tree(
+    repo_root: Path,
+    spec: TreeSpec,
+    *,
+    repeat: int,
+    jobs: int,
+    image_tools: int,
+    log: structlog.stdlib.BoundLogger,
+) -> list[dict[str, Any]]:
+    results: list[dict[str, Any]] = []
+    params = {"tools": spec.tools, "commits": spec.commits, "images": spec.images}
+
+    def record(name: str, measured: dict[str, Any], **extra: Any) -> None:
+        result = {"benchmark": name, **params, **extra, **measured}
+        log.info("benchmark", **result)
+        results.append(result)
+
+    # Without a scripted history there is no repo to walk; skip the git
+    # lookup instead of logging a failure on every run.
+    history = None if spec.commits else build_tools_data.GitHistoryIndex()
+
+    def build() -> str:
+        return build_tools_data.build_tools_yaml(
+            repo_root=repo_root, history=history, jobs=jobs
+        )
+
+    yaml_text = build()
+    record("build_tools_yaml", _measure(build, repeat=repeat), jobs=jobs)
+
+    head_entries = detect_tools_changes.load_yaml_entries(yaml_text)
+    worktree_entries = _mutate_entries(head_entries, random.Random(spec.seed))
+    record(
+        "load_yaml_entries",
+        _measure(
+            lambda: detect_tools_changes.load_yaml_entries(yaml_text), repeat=repeat
+        ),
+    )
+    record(
+        "summarize_changes",
+        _measure(
+            lambda: detect_tools_changes.summarize_changes(
+                head_entries, worktree_entries
+            ),
+            repeat=repeat,
+        ),
+    )
+    entries = build_tools_data.build_tool_entries(
+        repo_root=repo_root, history=history, jobs=jobs
+    )
+    worktree_text = build_tools_data._render_tools_yaml(
+        _mutate_tool_entries(entries, random.Random(spec.seed))
+    )
+    record(
+        "compare_tools_yaml",
+        _measure(
+            lambda: detect_tools_changes.compare_tools_yaml(yaml_text, worktree_text),
+            repeat=repeat,
+        ),
+    )
+
+    if spec.images and image_tools:
+        index_files = sorted((repo_root / "content" / "tools").rglob("index.md"))[
+            :image_tools
+        ]
+        scratch = repo_root.parent / f"{repo_root.name}-images"
+
+        def reset_images() -> None:
+            shutil.rmtree(scratch, ignore_errors=True)
+            for index_md in index_files:
+                shutil.copytree(
+                    index_md.parent, scratch / index_md.parent.relative_to(repo_root)
+                )
+
+        def convert_images() -> None:
+            stats = convert_page_images.ProcessingStats()
+            bundles = convert_page_images._read_bundles(
+                [scratch / index_md.relative_to(repo_root) for index_md in index_files],
+                log=log,
+                stats=stats,
+            )
+            convert_page_images.convert_bundles(
+                bundles,
+                repo_root=scratch,
+                options=convert_page_images.EncodeOptions(quality=80),
+                jobs=jobs,
+                log=log,
+                stats=stats,
+            )
+
+        record(
+            "convert_bundles",
+            _measure(convert_images, repeat=repeat, setup=reset_images),
+            index_files=len(index_files),
+            jobs=jobs,
+        )
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    return results
+
+
+def _git_describe(repo_root: Path) -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=repo_root,
+            check=True,
+            text=True,
+            capture_output=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _cmd_generate(args: argparse.Namespace, log: structlog.stdlib.BoundLogger) -> int:
+    spec = TreeSpec(
+        tools=args.tools,
+        commits=args.commits,
+        images=args.images,
+        image_size=args.image_size,
+        body_kb=args.body_kb,
+        seed=args.seed,
+    )
+    start = time.perf_counter()
+    generate_tree(args.dest, spec)
+    log.info(
+        "generated tree",
+        path=str(args.dest),
+        tools=spec.tools,
+        commits=spec.commits,
+        seconds=round(time.perf_counter() - start, 2),
+    )
+    return 0
+
+
+def _cmd_run(args: argparse.Namespace, log: structlog.stdlib.BoundLogger) -> int:
+    repo_root = Path(__file__).resolve().parents[1]
+    commit = _git_describe(repo_root)
+    out_path = args.out or repo_root / ".cache" / "bench" / f"{commit or 'local'}.json"
+
+    results: list[dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(prefix="tools-bench-") as workdir:
+        for size in args.sizes:
+            spec = TreeSpec(
+                tools=size,
+                commits=args.commits,
+                images=args.images,
+                image_size=args.image_size,
+                body_kb=args.body_kb,
+                seed=args.seed,
+            )
+            tree = generate_tree(Path(workdir) / f"tree-{size}", spec)
+            results += _bench_tree(
+                tree,
+                spec,
+                repeat=args.repeat,
+                jobs=args.jobs,
+                image_tools=args.image_tools,
+                log=log,
+            )
+            shutil.rmtree(tree, ignore_errors=True)
+
+    payload = {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(payload, indent=4) + "\n", encoding="utf-8")
+    log.info("wrote benchmark results", path=str(out_path), results=len(results))
+    return 0
+
+
+def _result_key(result: dict[str, Any]) -> tuple[Any, ...]:
+    return (result["benchmark"], result["tools"], result["commits"], result["images"])
+
+
+def _cmd_compare(args: argparse.Namespace, log: structlog.stdlib.BoundLogger) -> int:
+    base = json.loads(args.base.read_text(encoding="utf-8"))
+    new = json.loads(args.new.read_text(encoding="utf-8"))
+    base_results = {_result_key(result): result for result in base["results"]}
+
+    regressions = 0
+    for result in new["results"]:
+        previous = base_results.get(_result_key(result))
+        if previous is None:
+            continue
+        ratio = result["median_s"] / previous["median_s"] if previous["median_s"] else 0
+        regressed = ratio > 1 + args.threshold
+        regressions += regressed
+        print(
+            f"{result['benchmark']:<22} tools={result['tools']:<6} "
+            f"median {previous['median_s']:.4f}s -> {result['median_s']:.4f}s "
+            f"({ratio:.2f}x) peak {previous['peak_traced_mib']:.1f} -> "
+            f"{result['peak_traced_mib']:.1f} MiB{'  REGRESSION' if regressed else ''}"
+        )
+    log.info("compared benchmarks", base=base["commit"], new=new["commit"])
+    return 1 if regressions else 0
+
+
+def _startup_ms(command: list[str], *, repeat: int) -> float:
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    samples: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, capture_output=True, env=env)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def _cmd_startup(args: argparse.Namespace, log: structlog.stdlib.BoundLogger) -> int:
+    ci_dir = Path(__file__).resolve().parent
+    failures = 0
+
+    baseline_ms = _startup_ms([sys.executable, "-c", "pass"], repeat=args.repeat)
+    log.info("interpreter startup", median_ms=round(baseline_ms, 1))
+
+    for script in STARTUP_SCRIPTS:
+        elapsed_ms = _startup_ms(
+            [sys.executable, str(ci_dir / f"{script}.py"), "--help"],
+            repeat=args.repeat,
+        )
+        # Importing the module must not drag in the heavy dependencies; they
+        # are loaded on first use.
+        probe = (
+            f"import sys; sys.path.insert(0, {str(ci_dir)!r}); import {script}; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+        )
+        loaded = subprocess.run(
+            [sys.executable, "-c", probe], check=True, capture_output=True, text=True
+        ).stdout.strip()
+        over_budget = elapsed_ms - baseline_ms > args.budget_ms
+        failures += bool(loaded)
+        emit = log.warning if over_budget else log.info
+        emit(
+            "script startup",
+            script=script,
+            median_ms=round(elapsed_ms, 1),
+            over_interpreter_ms=round(elapsed_ms - baseline_ms, 1),
+            over_budget=over_budget,
+            eager_imports=loaded or None,
+            ok=not loaded,
+        )
+    return 1 if failures else 0
+
+
+def _parse_sizes(value: str) -> list[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def _parse_args(argv: Sequence[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the ci/ scripts.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_tree_options(command: argparse.ArgumentParser) -> None:
+        command.add_argument(
+            "--commits",
+            type=int,
+            default=0,
+            help="Scripted git history length (0 = plain directory, no git).",
+        )
+        command.add_argument(
+            "--images", type=int, default=0, help="PNG images per tool bundle."
+        )
+        command.add_argument(
+            "--image-size", type=int, default=256, help="Sample image edge in pixels."
+        )
+        command.add_argument(
+            "--body-kb", type=int, default=2, help="Approximate page body size."
+        )
+        command.add_argument("--seed", type=int, default=0, help="Random seed.")
+
+    generate = sub.add_parser("generate", help="Write a synthetic content tree.")
+    generate.add_argument("dest", type=Path, help="Directory to create.")
+    generate.add_argument("--tools", type=int, default=1000, help="Number of tools.")
+    add_tree_options(generate)
+
+    run = sub.add_parser("run", help="Run the benchmarks and write JSON results.")
+    run.add_argument(
+        "--sizes",
+        type=_parse_sizes,
+        default=[1000, 10000, 50000],
+        help="Comma separated tool counts (default: 1000,10000,50000).",
+    )
+    run.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark.")
+    run.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="--jobs for build_tools_yaml and image conversion.",
+    )
+    run.add_argument(
+        "--image-tools",
+        type=int,
+        default=50,
+        help="Bundles converted by the convert_bundles benchmark.",
+    )
+    run.add_argument(
+        "--out",
+        type=Path,
+        help="Results file (default: .cache/bench/<commit>.json).",
+    )
+    add_tree_options(run)
+
+    compare = sub.add_parser("compare", help="Compare two results files.")
+    compare.add_argument("base", type=Path)
+    compare.add_argument("new", type=Path)
+    compare.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Median slowdown treated as a regression (default: 0.1 = 10%%).",
+    )
+
+    startup = sub.add_parser(
+        "startup", help="Check script cold-start time and eager imports."
+    )
+    startup.add_argument(
+        "--budget-ms",
+        type=float,
+        default=150,
+        help="Warn when `--help` takes longer above a bare interpreter (default: 150).",
+    )
+    startup.add_argument("--repeat", type=int, default=5, help="Runs per script.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = _parse_args(argv)
+    log = configure_logging("ci.benchmark")
+    commands = {
+        "generate": _cmd_generate,
+        "run": _cmd_run,
+        "compare": _cmd_compare,
+        "startup": _cmd_startup,
+    }
+    return commands[args.command](args, log)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
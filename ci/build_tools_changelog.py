@@ -0,0 +1,254 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.14"
+# dependencies = [
+#   "structlog>=24.0.0",
+#   "PyYAML>=6.0.0",
+# ]
+# ///
+"""Build `data/tools_changelog.json` from the git history of `data/tools.yaml`.
+
+One `git log --first-parent` lists the commits that changed the file, and
+their versions are streamed through a single `git cat-file --batch` process;
+each is compared with the previous one as `ci/detect_tools_changes.py` does
+(by fingerprint where possible), so only two versions are held at a time.
+
+The output keeps `last_commit`. The next run starts from there and only walks
+the commits made since, prepending their items; if that commit is no longer in
+the history (e.g. after a force push) the changelog is rebuilt from scratch.
+
+Items are newest first and shaped for a feed: `id`, `date` (RFC 3339),
+`title`, and the `added`/`updated`/`removed` tools with their title. Added
+and updated tools also get their `path` on the site as of that commit; it
+is not revisited if the tool is removed later.
+
+Usage:
+    uv run ci/build_tools_changelog.py
+    uv run ci/build_tools_changelog.py --rebuild
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator, Sequence
+
+if TYPE_CHECKING:
+    import structlog
+
+from common.files import atomic_write_text, read_text_or_empty
+from common.git import GitObjectReader, run_git
+from common.log import configure_logging
+from common.metrics import Metrics, profile_to
+from detect_tools_changes import (
+    ToolChanges,
+    compare_tools_yaml,
+    index_tools_yaml,
+    load_yaml_entries,
+)
+
+# Bump when the layout of `data/tools_changelog.json` changes.
+CHANGELOG_FORMAT_VERSION = 1
+
+TOOLS_PATH = "data/tools.yaml"
+
+
+@dataclass(frozen=True)
+class Revision:
+    commit: str
+    date: str
+
+
+def iter_revisions(repo_root: Path, *, since: str | None) -> Iterator[Revision]:
+    """Commits that changed `data/tools.yaml` after `since`, oldest first."""
+
+    args = ["log", "--first-parent", "--reverse", "--format=%H %cI"]
+    args.append(f"{since}..HEAD" if since else "HEAD")
+    for line in run_git([*args, "--", TOOLS_PATH], cwd=repo_root).splitlines():
+        commit, _, date = line.partition(" ")
+        yield Revision(commit=commit, date=date)
+
+
+def _is_ancestor(repo_root: Path, commit: str) -> bool:
+    try:
+        run_git(["merge-base", "--is-ancestor", commit, "HEAD"], cwd=repo_root)
+    except RuntimeError:
+        return False
+    return True
+
+
+def _tool_titles(content: str, slugs: list[str]) -> dict[str, str]:
+    if not slugs:
+        return {}
+    index = index_tools_yaml(content)
+    if index is not None:
+        entries = {slug: index.load_entry(slug) for slug in slugs}
+    else:
+        entries = load_yaml_entries(content)
+    titles: dict[str, str] = {}
+    for slug in slugs:
+        data = entries.get(slug)
+        title = data.get("title") if isinstance(data, dict) else None
+        titles[slug] = str(title) if title else slug
+    return titles
+
+
+def _tools(
+    slugs: list[str], titles: dict[str, str], *, link: bool
+) -> list[dict[str, str]]:
+    tools = []
+    for slug in slugs:
+        tool = {"slug": slug, "title": titles[slug]}
+        if link:
+            tool["path"] = f"/tools/{slug}/"
+        tools.append(tool)
+    return tools
+
+
+def changelog_item(
+    revision: Revision, changes: ToolChanges, *, old: str, new: str
+) -> dict[str, Any]:
+    titles = _tool_titles(new, changes.added + changes.updated)
+    titles.update(_tool_titles(old, changes.removed))
+    return {
+        "id": revision.commit,
+        "date": revision.date,
+        "title": changes.summary(),
+        "added": _tools(changes.added, titles, link=True),
+        "updated": _tools(changes.updated, titles, link=True),
+        "removed": _tools(changes.removed, titles, link=False),
+    }
+
+
+def load_changelog(path: Path) -> dict[str, Any] | None:
+    try:
+        data = json.loads(read_text_or_empty(path) or "null")
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or data.get("version") != CHANGELOG_FORMAT_VERSION:
+        return None
+    return data
+
+
+def build_changelog(
+    repo_root: Path,
+    *,
+    previous: dict[str, Any] | None,
+    log: structlog.stdlib.BoundLogger,
+    metrics: Metrics,
+) -> dict[str, Any]:
+    """Return the changelog with the items for commits after `previous`."""
+
+    items: list[dict[str, Any]] = []
+    since = previous.get("last_commit") if previous else None
+    if since:
+        metrics.count("git_subprocesses")
+        if not _is_ancestor(repo_root, since):
+            log.warning(
+                "last changelog commit not in history, rebuilding", commit=since
+            )
+            previous = since = None
+
+    with GitObjectReader(repo_root) as reader:
+        old = ""
+        if since:
+            old = (reader.read_blob(since, TOOLS_PATH) or b"").decode("utf-8")
+        last_commit = since
+        revisions = iter_revisions(repo_root, since=since)
+        metrics.count("git_subprocesses")
+        for revision in metrics.timed_iter("git_log", revisions):
+            with metrics.phase("read_blobs"):
+                new = (reader.read_blob(revision.commit, TOOLS_PATH) or b"").decode(
+                    "utf-8"
+                )
+            with metrics.phase("compare"):
+                changes = compare_tools_yaml(old, new, metrics=metrics)
+                if changes.summary():
+                    items.append(changelog_item(revision, changes, old=old, new=new))
+            metrics.count("commits")
+            old, last_commit = new, revision.commit
+        metrics.count("git_subprocesses", reader.subprocess_count)
+        metrics.count("bytes_read", reader.bytes_read)
+
+    items.reverse()
+    metrics.count("items_added", len(items))
+    if previous:
+        items.extend(previous.get("items", []))
+    return {
+        "version": CHANGELOG_FORMAT_VERSION,
+        "last_commit": last_commit,
+        "updated": items[0]["date"] if items else None,
+        "items": items,
+    }
+
+
+def _parse_args(argv: Sequence[str] | None) -> argparse.Namespace:
+    repo_root = Path(__file__).resolve().parents[1]
+    parser = argparse.ArgumentParser(
+        description="Build data/tools_changelog.json from the history of data/tools.yaml.",
+    )
+    parser.add_argument(
+        "--out",
+        type=Path,
+        default=repo_root / "data" / "tools_changelog.json",
+        help="Changelog file to update (default: data/tools_changelog.json).",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Ignore the existing changelog and walk the whole history.",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        type=Path,
+        help="Write phase timings and counters (.json, else OpenMetrics text).",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        help="Dump cProfile stats for the build to this file.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = _parse_args(argv)
+    log = configure_logging("ci.build_tools_changelog")
+    repo_root = Path(__file__).resolve().parents[1]
+    metrics = Metrics("build_tools_changelog")
+
+    try:
+        with profile_to(args.profile):
+            previous = None if args.rebuild else load_changelog(args.out)
+            try:
+                changelog = build_changelog(
+                    repo_root, previous=previous, log=log, metrics=metrics
+                )
+            except RuntimeError as exc:
+                log.error("failed to read git history", error=str(exc))
+                return 1
+            if changelog == previous:
+                log.info("changelog unchanged", path=str(args.out))
+                return 0
+            with metrics.phase("write"):
+                text = json.dumps(changelog, indent=4, ensure_ascii=False) + "\n"
+                atomic_write_text(args.out, text)
+            metrics.count("bytes_written", len(text.encode()))
+            log.info(
+                "wrote changelog",
+                path=str(args.out),
+                items=len(changelog["items"]),
+                last_commit=changelog["last_commit"],
+            )
+            return 0
+    finally:
+        metrics.emit(log)
+        if args.metrics_out:
+            metrics.write(args.metrics_out)
+            log.info("wrote metrics", path=str(args.metrics_out))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -8,140 +8,59 @@
 # ///
 """Build `data/tools.yaml` by walking `content/tools/**/index.md`.
 
+A search/tag index over the same entries is written to `data/tools_index.json`.
+
 Rules (see PROBLEM.md):
 - Each `content/tools/**/index.md` is considered a tool entry unless:
   - it has `draft: true`, or
   - front matter contains `toolbox.ignore: true`
+
+Run with `--watch` next to `hugo server` to keep `data/tools.yaml` current
+while authoring tools.
 """
 
 from __future__ import annotations
 
-import logging
-import subprocess
-from dataclasses import dataclass
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Any, Iterable
+from typing import TYPE_CHECKING, Any, Iterable, Sequence
 
-try:
+if TYPE_CHECKING:
     import structlog
-except (
-    ModuleNotFoundError
-) as exc:  # pragma: no cover - dependency should be installed in CI
-    raise SystemExit(
-        "Missing dependency 'structlog'. "
-        "Install it (e.g. `pip install structlog`) or run via a PEP-723 aware runner (e.g. `uv run`)."
-    ) from exc
-
-try:
-    import yaml
-except (
-    ModuleNotFoundError
-) as exc:  # pragma: no cover - dependency should be installed in CI
-    raise SystemExit(
-        "Missing dependency 'PyYAML'. "
-        "Install it (e.g. `pip install pyyaml`) or run via a PEP-723 aware runner (e.g. `uv run`)."
-    ) from exc
-
-
-class FrontMatterError(ValueError):
-    pass
-
-
-def _configure_logging() -> structlog.stdlib.BoundLogger:
-    logging.basicConfig(level=logging.INFO, format="%(message)s")
-    structlog.configure(
-        processors=[
-            structlog.stdlib.add_log_level,
-            structlog.processors.TimeStamper(fmt="iso"),
-            structlog.processors.StackInfoRenderer(),
-            structlog.processors.format_exc_info,
-            structlog.dev.ConsoleRenderer(),
-        ],
-        logger_factory=structlog.stdlib.LoggerFactory(),
-        wrapper_class=structlog.stdlib.BoundLogger,
-        cache_logger_on_first_use=True,
-    )
-    return structlog.get_logger("ci.build_tools_data")
-
-
-def _run_git(args: list[str], *, cwd: Path) -> str:
-    result = subprocess.run(
-        ["git", *args],
-        cwd=cwd,
-        check=False,
-        text=True,
-        capture_output=True,
-    )
-    if result.returncode != 0:
-        raise RuntimeError(result.stderr.strip() or "git command failed")
-    return result.stdout.strip()
 
+from common.files import atomic_write_text, read_text_or_empty
+from common.front_matter import (
+    FrontMatterError,
+    parse_front_matter_text,
+    read_front_matter_text,
+)
+from common.git import GitHistoryIndex, build_git_history_index, run_git
+from common.log import configure_logging
+from common.metrics import Metrics, profile_to
+from common.tools import tool_file, toolbox_section
+from common.walk import DirCache, iter_bundle_index_files
+from detect_tools_changes import (
+    FINGERPRINT_KEY,
+    compare_tools_yaml,
+    entry_fingerprint,
+)
 
-def _get_tool_git_commits(tool_dir: Path) -> tuple[str | None, str | None]:
-    """Return (introduced_commit, updated_commit) for the tool directory.
-
-    If there is no git history, returns (None, None).
-    If the most recent commit matches the introduction commit, updated_commit is None.
-    """
-
-    repo_root = Path(__file__).resolve().parents[1]
-    rel_path = tool_dir.relative_to(repo_root)
-
-    try:
-        first_commit = _run_git(
-            ["log", "--reverse", "--format=%H", "--", str(rel_path)],
-            cwd=repo_root,
-        ).splitlines()
-        if not first_commit:
-            return None, None
-        introduced_commit = first_commit[0].strip() or None
-
-        latest_commit = (
-            _run_git(
-                ["log", "-n", "1", "--format=%H", "--", str(rel_path)],
-                cwd=repo_root,
-            ).strip()
-            or None
-        )
-    except Exception:
-        logger = structlog.get_logger("ci.build_tools_data")
-        logger.exception("git history lookup failed", tool_dir=str(rel_path))
-        return None, None
-
-    if introduced_commit and latest_commit and introduced_commit != latest_commit:
-        return introduced_commit, latest_commit
-    return introduced_commit, None
-
-
-def _extract_front_matter(md_text: str) -> dict[str, Any]:
-    lines = md_text.splitlines()
-    if not lines or lines[0].strip() != "---":
-        return {}
-
-    end = None
-    for idx in range(1, len(lines)):
-        if lines[idx].strip() == "---":
-            end = idx
-            break
-    if end is None:
-        raise FrontMatterError(
-            "Front matter starts with '---' but no closing '---' found."
-        )
+# Bump when the cached `ToolEntry` layout or the rendered YAML format changes.
+CACHE_FORMAT_VERSION = 2
 
-    block = "\n".join(lines[1:end]).strip("\n")
-    if not block.strip():
-        return {}
+# Bump when the layout of `data/tools.yaml` changes.
+TOOLS_FORMAT_VERSION = 2
 
-    try:
-        data = yaml.safe_load(block)
-    except yaml.YAMLError as exc:
-        raise FrontMatterError("Front matter YAML failed to parse.") from exc
+# Bump when the layout of `data/tools_index.json` changes.
+INDEX_FORMAT_VERSION = 1
 
-    if data is None:
-        return {}
-    if not isinstance(data, dict):
-        raise FrontMatterError("Front matter YAML must be a mapping.")
-    return data
+_TOKEN_RE = re.compile(r"\w+")
 
 
 def _yaml_quote(value: str) -> str:
@@ -161,8 +80,89 @@ class ToolEntry:
     tags: tuple[str, ...]
 
 
-def _iter_tool_index_files(tools_root: Path) -> Iterable[Path]:
-    yield from sorted(tools_root.rglob("index.md"))
+@dataclass
+class ToolEntryCache:
+    """Persistent `ToolEntry` cache keyed by slug.
+
+    Each record stores the key it was built from (index.md content hash plus
+    the tool directory's commits) and the resulting entry, or `None` when the
+    tool was skipped as a draft/ignored bundle.
+    """
+
+    path: Path
+    version: str
+    records: dict[str, dict[str, Any]] = field(default_factory=dict)
+    seen: dict[str, dict[str, Any]] = field(default_factory=dict)
+    hits: int = 0
+    misses: int = 0
+
+    def get(self, slug: str, key: str) -> tuple[bool, ToolEntry | None]:
+        record = self.records.get(slug)
+        if record is None or record.get("key") != key:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        self.seen[slug] = record
+        data = record.get("entry")
+        if data is None:
+            return True, None
+        fields = dict(data)
+        fields["tags"] = tuple(fields["tags"])
+        return True, ToolEntry(**fields)
+
+    def put(self, slug: str, key: str, entry: ToolEntry | None) -> None:
+        self.seen[slug] = {
+            "key": key,
+            "entry": asdict(entry) if entry is not None else None,
+        }
+
+
+def _cache_version() -> str:
+    digest = hashlib.sha256(f"{CACHE_FORMAT_VERSION}\0".encode())
+    script = Path(__file__).resolve()
+    for source in [script, *sorted((script.parent / "common").glob("*.py"))]:
+        digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+
+def _load_entry_cache(cache_dir: Path) -> ToolEntryCache:
+    """Load the entry cache, discarding it if it was written by another version."""
+
+    cache = ToolEntryCache(path=cache_dir / "entries.json", version=_cache_version())
+    try:
+        data = json.loads(cache.path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return cache
+    if not isinstance(data, dict) or data.get("version") != cache.version:
+        return cache
+    records = data.get("records")
+    if isinstance(records, dict):
+        cache.records = records
+    return cache
+
+
+def _save_entry_cache(cache: ToolEntryCache) -> None:
+    """Persist the records seen during this run, skipping the write if unchanged."""
+
+    if cache.seen == cache.records and cache.path.exists():
+        return
+    payload = {"version": cache.version, "records": cache.seen}
+    atomic_write_text(cache.path, json.dumps(payload, sort_keys=True))
+
+
+def _entry_cache_key(
+    front_matter: str | None, commits: tuple[str | None, str | None]
+) -> str:
+    digest = hashlib.sha256((front_matter or "").encode())
+    for commit in commits:
+        digest.update(b"\0" + (commit or "").encode())
+    return digest.hexdigest()
+
+
+def _iter_tool_index_files(
+    tools_root: Path, *, dir_cache: DirCache | None = None
+) -> Iterable[Path]:
+    yield from iter_bundle_index_files(tools_root, dir_cache=dir_cache)
 
 
 def _coerce_tags(value: Any) -> tuple[str, ...]:
@@ -175,39 +175,76 @@ def _coerce_tags(value: Any) -> tuple[str, ...]:
     return ()
 
 
-def _build_tool_entry(index_md: Path, *, tools_root: Path) -> ToolEntry | None:
-    fm = _extract_front_matter(index_md.read_text(encoding="utf-8"))
+@dataclass(frozen=True)
+class ToolEntrySource:
+    """Raw inputs for one tool entry; small and picklable for worker processes.
+
+    Only the front matter text is kept, the page body is never read. Callers
+    that already parsed it (see `ci/pipeline.py`) pass the mapping as `parsed`.
+    """
+
+    index_md: Path
+    rel_dir: Path
+    front_matter: str | None
+    commits: tuple[str | None, str | None]
+    parsed: dict[str, Any] | None = field(default=None, compare=False, repr=False)
+
+    @property
+    def slug(self) -> str:
+        return self.rel_dir.as_posix()
+
+    @property
+    def cache_key(self) -> str:
+        return _entry_cache_key(self.front_matter, self.commits)
+
+
+def _load_tool_entry_source(
+    index_md: Path, *, tools_root: Path, history: GitHistoryIndex
+) -> ToolEntrySource:
+    rel_dir = index_md.parent.relative_to(tools_root)
+    try:
+        front_matter = read_front_matter_text(index_md)
+    except Exception as exc:
+        exc.add_note(f"while reading front matter from {index_md}")
+        raise
+    return ToolEntrySource(
+        index_md=index_md,
+        rel_dir=rel_dir,
+        front_matter=front_matter.block_text if front_matter else None,
+        commits=history.lookup(rel_dir.as_posix()),
+    )
+
+
+def _build_tool_entry(source: ToolEntrySource) -> ToolEntry | None:
+    try:
+        return _parse_tool_entry(source)
+    except Exception as exc:
+        exc.add_note(f"while building tool entry from {source.index_md}")
+        raise
+
+
+def _parse_tool_entry(source: ToolEntrySource) -> ToolEntry | None:
+    fm = source.parsed
+    if fm is None:
+        fm = parse_front_matter_text(source.front_matter or "")
     if fm.get("draft") is True:
         return None
 
-    toolbox: dict[str, Any] = {}
-    if isinstance(fm.get("toolbox"), dict):
-        toolbox = fm["toolbox"]
-    elif isinstance(fm.get("tool"), dict):
-        toolbox = fm["tool"]
-
+    toolbox = toolbox_section(fm)
     if toolbox.get("ignore") is True:
         return None
 
-    rel_dir = index_md.parent.relative_to(tools_root)
+    rel_dir = source.rel_dir
     slug = rel_dir.as_posix()
     language = rel_dir.parts[0] if rel_dir.parts else ""
 
     title = str(fm.get("title") or "")
     description = str(fm.get("description") or "")
 
-    toolbox_file = str(toolbox.get("file") or "tool.html")
-    resources = fm.get("resources")
-    if isinstance(resources, list):
-        for item in resources:
-            if not isinstance(item, dict):
-                continue
-            if item.get("name") == "tool-file" and item.get("src"):
-                toolbox_file = str(item["src"])
-                break
+    toolbox_file = tool_file(fm, toolbox)
     tags = _coerce_tags(fm.get("tags"))
 
-    introduced_commit, updated_commit = _get_tool_git_commits(index_md.parent)
+    introduced_commit, updated_commit = source.commits
 
     return ToolEntry(
         slug=slug,
@@ -221,71 +258,524 @@ def _build_tool_entry(index_md: Path, *, tools_root: Path) -> ToolEntry | None:
     )
 
 
+def _timed_build_tool_entry(source: ToolEntrySource) -> tuple[ToolEntry | None, float]:
+    start = time.perf_counter()
+    entry = _build_tool_entry(source)
+    return entry, time.perf_counter() - start
+
+
+def _build_tool_entries(
+    sources: list[ToolEntrySource], *, jobs: int, metrics: Metrics
+) -> list[ToolEntry | None]:
+    """Build entries in input order, fanning out to `jobs` worker processes."""
+
+    if jobs <= 1 or len(sources) < 2:
+        results = [_timed_build_tool_entry(source) for source in sources]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        chunksize = max(1, len(sources) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(
+                pool.map(_timed_build_tool_entry, sources, chunksize=chunksize)
+            )
+
+    entries: list[ToolEntry | None] = []
+    for source, (entry, seconds) in zip(sources, results):
+        metrics.record_file("parse", source.index_md, seconds)
+        entries.append(entry)
+    return entries
+
+
+def _render_entry_yaml(entry: ToolEntry) -> list[str]:
+    lines = [f"      title: {_yaml_quote(entry.title)}"]
+    lines.append(f"      language: {_yaml_quote(entry.language)}")
+    lines.append(f"      description: {_yaml_quote(entry.description)}")
+    lines.append("      toolbox:")
+    lines.append(f"        file: {_yaml_quote(entry.toolbox_file)}")
+    lines.append(
+        "        introduced_commit: "
+        + (_yaml_quote(entry.introduced_commit) if entry.introduced_commit else "null")
+    )
+    lines.append(
+        "        updated_commit: "
+        + (_yaml_quote(entry.updated_commit) if entry.updated_commit else "null")
+    )
+    if entry.tags:
+        lines.append("      tags:")
+        for tag in entry.tags:
+            lines.append(f"        - {_yaml_quote(tag)}")
+    return lines
+
+
 def _render_tools_yaml(entries: list[ToolEntry]) -> str:
-    lines: list[str] = ["---", "version: 1"]
+    """Render `data/tools.yaml`.
+
+    Each entry starts with a `fingerprint` of its rendered fields and the
+    header carries a `digest` over all of them, so `detect_tools_changes`
+    can compare two versions without parsing unchanged entries.
+    """
 
+    body: list[str] = []
+    digest = hashlib.sha256()
+    for entry in entries:
+        lines = _render_entry_yaml(entry)
+        fingerprint = entry_fingerprint(entry.slug, lines)
+        digest.update(f"{entry.slug}\0{fingerprint}\n".encode())
+        body.append(f"  - {entry.slug}:")
+        body.append(f"      {FINGERPRINT_KEY}: {_yaml_quote(fingerprint)}")
+        body.extend(lines)
+
+    lines = [
+        "---",
+        f"version: {TOOLS_FORMAT_VERSION}",
+        f"digest: {_yaml_quote(digest.hexdigest())}",
+    ]
     if not entries:
         lines.append("tools: []")
-        return "\n".join(lines) + "\n"
+    else:
+        lines.append("tools:")
+        lines.extend(body)
+    return "\n".join(lines) + "\n"
 
-    lines.append("tools:")
-    for entry in entries:
-        lines.append(f"  - {entry.slug}:")
-        lines.append(f"      title: {_yaml_quote(entry.title)}")
-        lines.append(f"      language: {_yaml_quote(entry.language)}")
-        lines.append(f"      description: {_yaml_quote(entry.description)}")
-        lines.append("      toolbox:")
-        lines.append(f"        file: {_yaml_quote(entry.toolbox_file)}")
-        lines.append(
-            "        introduced_commit: "
-            + (
-                _yaml_quote(entry.introduced_commit)
-                if entry.introduced_commit
-                else "null"
-            )
-        )
-        lines.append(
-            "        updated_commit: "
-            + (_yaml_quote(entry.updated_commit) if entry.updated_commit else "null")
+
+def _tokenize(*values: str) -> set[str]:
+    return {
+        token
+        for value in values
+        for token in _TOKEN_RE.findall(value.casefold())
+        if len(token) > 1
+    }
+
+
+def _render_tools_index(entries: list[ToolEntry]) -> str:
+    """Render `data/tools_index.json` for lookups instead of linear scans.
+
+    Tools are identified by their position in `tools` (sorted by slug).
+    `tags`, `languages` and `tokens` map a key to the ids that carry it.
+    `tokens` holds casefolded words from title, description and tags; its
+    keys are sorted so clients can binary search them for prefix matches.
+    """
+
+    tools: list[dict[str, str]] = []
+    tags: dict[str, list[int]] = {}
+    languages: dict[str, list[int]] = {}
+    tokens: dict[str, list[int]] = {}
+    for tool_id, entry in enumerate(entries):
+        tools.append(
+            {
+                "slug": entry.slug,
+                "title": entry.title,
+                "description": entry.description,
+                "language": entry.language,
+            }
         )
-        if entry.tags:
-            lines.append("      tags:")
-            for tag in entry.tags:
-                lines.append(f"        - {_yaml_quote(tag)}")
+        for tag in dict.fromkeys(entry.tags):
+            tags.setdefault(tag, []).append(tool_id)
+        languages.setdefault(entry.language, []).append(tool_id)
+        for token in _tokenize(entry.title, entry.description, *entry.tags):
+            tokens.setdefault(token, []).append(tool_id)
+
+    payload = {
+        "version": INDEX_FORMAT_VERSION,
+        "tools": tools,
+        "tags": tags,
+        "languages": languages,
+        "tokens": tokens,
+    }
+    return (
+        json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        + "\n"
+    )
 
-    return "\n".join(lines) + "\n"
+
+def build_tools_yaml(
+    *,
+    repo_root: Path,
+    history: GitHistoryIndex | None = None,
+    cache: ToolEntryCache | None = None,
+    jobs: int = 1,
+    metrics: Metrics | None = None,
+) -> str:
+    metrics = metrics or Metrics("build_tools_data")
+    entries = build_tool_entries(
+        repo_root=repo_root, history=history, cache=cache, jobs=jobs, metrics=metrics
+    )
+    with metrics.phase("render"):
+        return _render_tools_yaml(entries)
 
 
-def build_tools_yaml(*, repo_root: Path) -> str:
+def _iter_tool_entry_sources(
+    tools_root: Path, *, history: GitHistoryIndex, metrics: Metrics
+) -> Iterable[ToolEntrySource]:
+    for index_md in metrics.timed_iter("walk", _iter_tool_index_files(tools_root)):
+        start = time.perf_counter()
+        source = _load_tool_entry_source(
+            index_md, tools_root=tools_root, history=history
+        )
+        elapsed = time.perf_counter() - start
+        metrics.add_time("read_front_matter", elapsed)
+        metrics.record_file("read_front_matter", index_md, elapsed)
+        metrics.count("index_files")
+        metrics.count("front_matter_bytes", len((source.front_matter or "").encode()))
+        yield source
+
+
+def build_tool_entries(
+    *,
+    repo_root: Path,
+    history: GitHistoryIndex | None = None,
+    cache: ToolEntryCache | None = None,
+    jobs: int = 1,
+    metrics: Metrics | None = None,
+    sources: Iterable[ToolEntrySource] | None = None,
+) -> list[ToolEntry]:
+    """Return every published tool entry, sorted by slug.
+
+    `sources` replaces the walk of `content/tools` when the caller has
+    already read the bundles.
+    """
+
+    metrics = metrics or Metrics("build_tools_data")
     tools_root = repo_root / "content" / "tools"
+    if sources is None:
+        if history is None:
+            with metrics.phase("git_history"):
+                history = build_git_history_index(tools_root)
+            metrics.count("git_subprocesses", history.subprocess_count)
+        sources = _iter_tool_entry_sources(tools_root, history=history, metrics=metrics)
     entries: list[ToolEntry] = []
-    for index_md in _iter_tool_index_files(tools_root):
-        entry = _build_tool_entry(index_md, tools_root=tools_root)
+    pending: list[ToolEntrySource] = []
+    for source in sources:
+        if cache is not None:
+            hit, entry = cache.get(source.slug, source.cache_key)
+            if hit:
+                if entry is not None:
+                    entries.append(entry)
+                continue
+        pending.append(source)
+
+    with metrics.phase("parse"):
+        built = _build_tool_entries(pending, jobs=jobs, metrics=metrics)
+    for source, entry in zip(pending, built):
+        if cache is not None:
+            cache.put(source.slug, source.cache_key, entry)
         if entry is not None:
             entries.append(entry)
+    metrics.count("entries_parsed", len(pending))
+    metrics.count("tools", len(entries))
 
     entries.sort(key=lambda e: e.slug)
-    return _render_tools_yaml(entries)
+    return entries
+
+
+def describe_changes(old_text: str, new_text: str) -> str:
+    """Summarize how `new_text` differs from `old_text` ("" if identical).
+
+    Matches the string the Pages workflow uses for its commit message.
+    """
+
+    if old_text == new_text:
+        return ""
+    summary = compare_tools_yaml(old_text, new_text).summary()
+    return summary or "data/tools.yaml updated"
+
+
+def _stat_stamp(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _scan_index_files(
+    tools_root: Path, dir_cache: DirCache
+) -> dict[Path, tuple[int, int]]:
+    snapshot: dict[Path, tuple[int, int]] = {}
+    for index_md in _iter_tool_index_files(tools_root, dir_cache=dir_cache):
+        stamp = _stat_stamp(index_md)
+        if stamp is not None:
+            snapshot[index_md] = stamp
+    return snapshot
+
+
+def watch_tools_yaml(
+    *,
+    repo_root: Path,
+    out_path: Path,
+    index_path: Path,
+    interval: float,
+    log: structlog.stdlib.BoundLogger,
+) -> int:
+    """Poll `content/tools/` and re-render `out_path` whenever an index.md changes.
+
+    Entries are kept in memory and only the index.md files whose mtime or size
+    changed are re-parsed; directories whose mtime is unchanged are not
+    re-listed. The git history index is rebuilt when `HEAD` moves
+    (detected via the reflog), which re-parses everything.
+    """
 
+    tools_root = repo_root / "content" / "tools"
+    try:
+        # `.git` is a file in worktrees and submodules; ask git where it is.
+        head_log = repo_root / run_git(
+            ["rev-parse", "--git-path", "logs/HEAD"], cwd=repo_root
+        )
+    except RuntimeError as exc:
+        log.warning("cannot locate the HEAD reflog", error=str(exc))
+        head_log = repo_root / ".git" / "logs" / "HEAD"
+    current_text = read_text_or_empty(out_path)
+    current_index = read_text_or_empty(index_path)
+
+    history = GitHistoryIndex()
+    head_stamp: tuple[int, int] | None = (-1, -1)
+    snapshot: dict[Path, tuple[int, int]] = {}
+    dir_cache: DirCache = {}
+    entries: dict[Path, ToolEntry | None] = {}
+
+    log.info("watching tools", tools_root=str(tools_root), interval=interval)
+    try:
+        while True:
+            started = time.perf_counter()
+            stamp = _stat_stamp(head_log)
+            if stamp != head_stamp:
+                history = build_git_history_index(tools_root)
+                head_stamp = stamp
+                snapshot = {}
+
+            latest = _scan_index_files(tools_root, dir_cache)
+            changed = [path for path, st in latest.items() if snapshot.get(path) != st]
+            removed = snapshot.keys() - latest.keys()
+            snapshot = latest
+
+            for index_md in removed:
+                entries.pop(index_md, None)
+            for index_md in changed:
+                try:
+                    source = _load_tool_entry_source(
+                        index_md, tools_root=tools_root, history=history
+                    )
+                    entries[index_md] = _build_tool_entry(source)
+                except (OSError, UnicodeDecodeError, FrontMatterError) as exc:
+                    # Keep the previous entry; the next save will retry.
+                    log.error(
+                        "failed to build tool entry", path=str(index_md), error=str(exc)
+                    )
+
+            if changed or removed:
+                published = sorted(
+                    (entry for entry in entries.values() if entry is not None),
+                    key=lambda e: e.slug,
+                )
+                index_text = _render_tools_index(published)
+                if index_text != current_index:
+                    atomic_write_text(index_path, index_text)
+                    current_index = index_text
+                yaml_text = _render_tools_yaml(published)
+                changes = describe_changes(current_text, yaml_text)
+                if changes:
+                    atomic_write_text(out_path, yaml_text)
+                    current_text = yaml_text
+                    log.info(
+                        "wrote tools data",
+                        path=str(out_path),
+                        changes=changes,
+                        elapsed_ms=round((time.perf_counter() - started) * 1000, 1),
+                    )
+
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        log.info("stopped watching tools")
+    return 0
+
+
+def _parse_args(argv: Sequence[str] | None) -> argparse.Namespace:
+    repo_root = Path(__file__).resolve().parents[1]
+    parser = argparse.ArgumentParser(
+        description="Build data/tools.yaml from content/tools/**/index.md.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=repo_root / ".cache" / "tools-data",
+        help="Directory for the incremental tool entry cache.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Rebuild every entry and do not read or write the cache.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Parse front matter in N worker processes (0 = one per CPU).",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Do not write; exit 1 if data/tools.yaml is out of date.",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and rewrite data/tools.yaml whenever a tool changes.",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.05,
+        help="Polling interval in seconds for --watch (default: 0.05).",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        type=Path,
+        help="Write phase timings and counters (.json, else OpenMetrics text).",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        help="Dump cProfile stats for the build to this file.",
+    )
+    args = parser.parse_args(argv)
+    if args.watch and args.check:
+        parser.error("--watch and --check cannot be combined")
+    if args.jobs < 0:
+        parser.error("--jobs must be 0 or a positive integer")
+    if args.jobs == 0:
+        args.jobs = os.cpu_count() or 1
+    return args
+
+
+def build_and_write(
+    args: argparse.Namespace,
+    *,
+    log: structlog.stdlib.BoundLogger,
+    metrics: Metrics,
+    history: GitHistoryIndex | None = None,
+    sources: Iterable[ToolEntrySource] | None = None,
+) -> int:
+    """Build the tools data, print the change summary and write what changed.
+
+    `args` needs `cache_dir`, `no_cache`, `jobs` and `check`. `history` and
+    `sources` let a caller that already walked the tree skip that work.
+    """
 
-def main() -> int:
-    log = _configure_logging()
     repo_root = Path(__file__).resolve().parents[1]
     tools_root = repo_root / "content" / "tools"
     out_path = repo_root / "data" / "tools.yaml"
+    index_path = repo_root / "data" / "tools_index.json"
+
+    with metrics.phase("cache_load"):
+        cache = None if args.no_cache else _load_entry_cache(args.cache_dir)
 
     log.info("building tools data", tools_root=tools_root)
     try:
-        yaml_text = build_tools_yaml(repo_root=repo_root)
+        if history is None:
+            with metrics.phase("git_history"):
+                history = build_git_history_index(tools_root)
+            metrics.count("git_subprocesses", history.subprocess_count)
+        entries = build_tool_entries(
+            repo_root=repo_root,
+            history=history,
+            cache=cache,
+            jobs=args.jobs,
+            metrics=metrics,
+            sources=sources,
+        )
+        with metrics.phase("render"):
+            yaml_text = _render_tools_yaml(entries)
+            index_text = _render_tools_index(entries)
     except Exception:
         log.exception("failed to build tools data")
         raise
 
-    out_path.write_text(yaml_text, encoding="utf-8")
-    tool_count = yaml_text.count("\n  - ")
-    log.info("wrote tools data", path=str(out_path), tools=tool_count)
+    if cache is not None:
+        try:
+            with metrics.phase("cache_save"):
+                _save_entry_cache(cache)
+        except OSError as exc:
+            log.warning("failed to write cache", path=str(cache.path), error=str(exc))
+        metrics.count("cache_hits", cache.hits)
+        metrics.count("cache_misses", cache.misses)
+        log.info("tool entry cache", hits=cache.hits, misses=cache.misses)
+
+    with metrics.phase("compare"):
+        current_text = read_text_or_empty(out_path)
+        current_index = read_text_or_empty(index_path)
+        metrics.count("bytes_read", len(current_text.encode()))
+        metrics.count("bytes_read", len(current_index.encode()))
+
+        # The change summary goes to stdout (logs go to stderr) so callers can
+        # capture it, e.g. for the commit message in the Pages workflow.
+        changes = describe_changes(current_text, yaml_text)
+        index_changed = index_text != current_index
+        if index_changed and not changes:
+            changes = "data/tools_index.json updated"
+    if changes:
+        print(changes)
+
+    tool_count = len(entries)
+    if args.check:
+        log.info(
+            "checked tools data",
+            path=str(out_path),
+            tools=tool_count,
+            up_to_date=not changes,
+            git_subprocesses=history.subprocess_count,
+        )
+        return 1 if changes else 0
+
+    if not changes:
+        log.info(
+            "tools data unchanged",
+            path=str(out_path),
+            tools=tool_count,
+            git_subprocesses=history.subprocess_count,
+        )
+        return 0
+
+    with metrics.phase("write"):
+        if yaml_text != current_text:
+            atomic_write_text(out_path, yaml_text)
+            metrics.count("bytes_written", len(yaml_text.encode()))
+        if index_changed:
+            atomic_write_text(index_path, index_text)
+            metrics.count("bytes_written", len(index_text.encode()))
+    log.info(
+        "wrote tools data",
+        path=str(out_path),
+        tools=tool_count,
+        git_subprocesses=history.subprocess_count,
+    )
     return 0
 
 
+def main(argv: Sequence[str] | None = None) -> int:
+    args = _parse_args(argv)
+    log = configure_logging("ci.build_tools_data")
+    repo_root = Path(__file__).resolve().parents[1]
+
+    if args.watch:
+        return watch_tools_yaml(
+            repo_root=repo_root,
+            out_path=repo_root / "data" / "tools.yaml",
+            index_path=repo_root / "data" / "tools_index.json",
+            interval=args.interval,
+            log=log,
+        )
+
+    metrics = Metrics("build_tools_data")
+    try:
+        with profile_to(args.profile):
+            return build_and_write(args, log=log, metrics=metrics)
+    finally:
+        metrics.emit(log)
+        if args.metrics_out:
+            metrics.write(args.metrics_out)
+            log.info("wrote metrics", path=str(args.metrics_out))
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -0,0 +1,5 @@
+"""Helpers shared by the scripts in `ci/`.
+
+The scripts are run directly (e.g. `uv run ci/build_tools_data.py`), which puts
+`ci/` on `sys.path` so this package can be imported as `common`.
+"""
@@ -0,0 +1,109 @@
+"""Content-addressed file cache for build artifacts such as encoded images.
+
+Entries live at `<root>/<key[:2]>/<key><suffix>`. A hit bumps the entry's
+mtime so `evict` can drop the least recently used entries once the cache
+outgrows its cap. Entries are written through a temporary file and
+`os.replace`, so concurrent workers never see a partial file.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+_CHUNK_SIZE = 1 << 20
+
+
+def hash_file(path: Path, *params: object) -> str:
+    """Return a hex digest of the bytes of `path` plus `params`."""
+
+    digest = hashlib.sha256()
+    for param in params:
+        digest.update(f"{param}\0".encode())
+    with path.open("rb") as handle:
+        while chunk := handle.read(_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class ContentCache:
+    root: Path
+    suffix: str = ""
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}{self.suffix}"
+
+    def lookup(self, key: str) -> Path | None:
+        """The entry for `key`, marked as used; None if there is none."""
+
+        entry = self.path_for(key)
+        try:
+            os.utime(entry)
+        except FileNotFoundError:
+            return None
+        return entry
+
+    def fetch(self, key: str, dest: Path) -> bool:
+        """Copy the entry for `key` to `dest`; False if there is none."""
+
+        entry = self.path_for(key)
+        try:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(entry, dest)
+            os.utime(entry)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def store(self, key: str, src: Path) -> bool:
+        """Add `src` under `key`; False if the cache could not be written."""
+
+        entry = self.path_for(key)
+        try:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=entry.parent, prefix=f".{key}.")
+            os.close(fd)
+            try:
+                shutil.copyfile(src, tmp_name)
+                os.replace(tmp_name, entry)
+            except BaseException:
+                Path(tmp_name).unlink(missing_ok=True)
+                raise
+        except OSError:
+            return False
+        return True
+
+    def evict(self, max_bytes: int) -> tuple[int, int]:
+        """Delete least recently used entries until at most `max_bytes` remain.
+
+        Returns (entries_removed, bytes_remaining).
+        """
+
+        entries: list[tuple[int, int, Path]] = []
+        total = 0
+        if not self.root.is_dir():
+            return 0, 0
+        for shard in os.scandir(self.root):
+            if not shard.is_dir(follow_symlinks=False):
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.startswith(".") or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, Path(entry.path)))
+                total += stat.st_size
+
+        removed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed, total
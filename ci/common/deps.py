@@ -0,0 +1,21 @@
+"""Deferred imports for the third-party dependencies of the ci/ scripts.
+
+Importing structlog, PyYAML or Pillow costs tens of milliseconds, so the
+scripts only pull them in on first use. A missing package still exits with
+the same friendly message the scripts used to print at import time.
+"""
+
+from __future__ import annotations
+
+import importlib
+from types import ModuleType
+
+
+def require(module: str, *, package: str, pip_name: str) -> ModuleType:
+    try:
+        return importlib.import_module(module)
+    except ModuleNotFoundError as exc:  # pragma: no cover - installed in CI
+        raise SystemExit(
+            f"Missing dependency '{package}'. "
+            f"Install it (e.g. `pip install {pip_name}`) or run via a PEP-723 aware runner (e.g. `uv run`)."
+        ) from exc
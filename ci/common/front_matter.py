@@ -0,0 +1,88 @@
+"""Bounded front matter reader for Hugo page bundles.
+
+Only the lines up to the closing `---` fence are read from disk; the page body
+is never loaded. YAML is parsed with libyaml (`yaml.CSafeLoader`) when PyYAML
+was built with it, falling back to the pure-Python `yaml.SafeLoader`.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Iterator, TextIO
+
+from common.deps import require
+
+FENCE = "---"
+
+
+@cache
+def _yaml() -> tuple[ModuleType, type]:
+    yaml = require("yaml", package="PyYAML", pip_name="pyyaml")
+    return yaml, getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+class FrontMatterError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class FrontMatterText:
+    """Raw front matter between the fences.
+
+    `end_line` is the index of the closing fence in `md_text.splitlines()`.
+    """
+
+    block_text: str
+    end_line: int
+
+
+def _iter_lines(handle: TextIO) -> Iterator[str]:
+    # Splitting each physical line again keeps the result identical to
+    # `md_text.splitlines()` on the whole file.
+    for physical in handle:
+        yield from physical.splitlines()
+
+
+def read_front_matter_text(path: Path) -> FrontMatterText | None:
+    """Return the raw front matter of `path`, or None if it has none.
+
+    Raises `FrontMatterError` if the opening fence is never closed.
+    """
+
+    with path.open(encoding="utf-8") as handle:
+        lines = _iter_lines(handle)
+        first = next(lines, None)
+        if first is None or first.strip() != FENCE:
+            return None
+
+        block: list[str] = []
+        for line in lines:
+            if line.strip() == FENCE:
+                return FrontMatterText(
+                    block_text="\n".join(block), end_line=len(block) + 1
+                )
+            block.append(line)
+
+    raise FrontMatterError("Front matter starts with '---' but no closing '---' found.")
+
+
+def parse_front_matter_text(block_text: str) -> dict[str, Any]:
+    """Parse a front matter block into a mapping (empty if the block is blank)."""
+
+    if not block_text.strip():
+        return {}
+
+    yaml, loader = _yaml()
+    try:
+        data = yaml.load(block_text, Loader=loader)
+    except yaml.YAMLError as exc:
+        raise FrontMatterError("Front matter YAML failed to parse.") from exc
+
+    if data is None:
+        return {}
+    if not isinstance(data, dict):
+        raise FrontMatterError("Front matter YAML must be a mapping.")
+    return data
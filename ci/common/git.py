@@ -0,0 +1,268 @@
+"""git helpers shared by the ci/ scripts."""
+
+from __future__ import annotations
+
+import subprocess
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable
+
+from common.log import get_logger
+
+
+def run_git(args: list[str], *, cwd: Path) -> str:
+    result = subprocess.run(
+        ["git", *args],
+        cwd=cwd,
+        check=False,
+        text=True,
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or "git command failed")
+    return result.stdout.strip()
+
+
+@dataclass
+class GitHistoryIndex:
+    """Map of directories (relative to the walked root) to (introduced, latest) commits.
+
+    Built from a single `git log --name-only` walk so tool lookups never have
+    to fork git themselves.
+    """
+
+    commits: dict[str, tuple[str, str]] = field(default_factory=dict)
+    subprocess_count: int = 0
+
+    def lookup(self, rel_dir: str) -> tuple[str | None, str | None]:
+        """Return (introduced_commit, updated_commit) for `rel_dir`.
+
+        If there is no git history, returns (None, None).
+        If the most recent commit matches the introduction commit, updated_commit is None.
+        """
+
+        found = self.commits.get(rel_dir)
+        if found is None:
+            return None, None
+        introduced_commit, latest_commit = found
+        if introduced_commit != latest_commit:
+            return introduced_commit, latest_commit
+        return introduced_commit, None
+
+
+def _iter_parent_dirs(rel_path: str) -> Iterable[str]:
+    parent = rel_path.rpartition("/")[0]
+    while parent:
+        yield parent
+        parent = parent.rpartition("/")[0]
+
+
+def _touched_dirs(files: Iterable[str]) -> set[str]:
+    return {rel_dir for name in files for rel_dir in _iter_parent_dirs(name)}
+
+
+def build_git_history_index(root: Path) -> GitHistoryIndex:
+    """Walk the history of `root` once and index every directory under it.
+
+    `git log` emits commits newest first, so the first commit seen for a
+    directory is its latest change and the last one seen is its introduction.
+    With `-m` a merge lists its files once per parent; it counts as changing
+    a directory only when the directory differs from every parent (e.g. a
+    conflict resolution), as a per-directory `git log -- <dir>` would show it.
+    Renames are not detected, so a file moved between directories counts for
+    both.
+
+    One difference from per-directory `git log` remains: that simplifies
+    away a side branch whose change to the directory a merge discarded (an
+    "ours" resolution), while this walk still counts the side branch's
+    commits for it.
+    """
+
+    index = GitHistoryIndex()
+
+    try:
+        index.subprocess_count += 1
+        output = run_git(
+            [
+                "log",
+                "-m",
+                "--name-only",
+                "--no-renames",
+                "--relative",
+                "-z",
+                "--format=%x01%H %P",
+                "--",
+                ".",
+            ],
+            cwd=root,
+        )
+    except Exception:
+        logger = get_logger("ci.git")
+        logger.exception("git history lookup failed", root=str(root))
+        return index
+
+    # (commit, parent count, files) per block; a merge has one block per
+    # parent it differs from, one after the other.
+    blocks: list[tuple[str, int, list[str]]] = []
+    for token in output.split("\0"):
+        token = token.strip("\n")
+        if not token:
+            continue
+        if token.startswith("\x01"):
+            commit, *parents = token[1:].split()
+            blocks.append((commit, len(parents), []))
+        elif blocks:
+            blocks[-1][2].append(token)
+
+    commits = index.commits
+    position = 0
+    while position < len(blocks):
+        commit, parents, files = blocks[position]
+        touched = _touched_dirs(files)
+        position += 1
+        seen = 1
+        while position < len(blocks) and blocks[position][0] == commit:
+            touched &= _touched_dirs(blocks[position][2])
+            position += 1
+            seen += 1
+        if seen < parents:
+            # Identical to some parent everywhere under `root`.
+            touched = set()
+        for rel_dir in touched:
+            found = commits.get(rel_dir)
+            if found is None:
+                commits[rel_dir] = (commit, commit)
+            elif found[0] != commit:
+                commits[rel_dir] = (commit, found[1])
+
+    return index
+
+
+def _split_z(output: str) -> list[str]:
+    return [name for name in output.split("\0") if name]
+
+
+def changed_files(ref: str, *, cwd: Path) -> list[Path]:
+    """Files that differ from `ref` in the working tree, including untracked ones.
+
+    Staged and unstaged changes both count; deletions and both sides of a
+    rename are listed too. Paths are absolute.
+    """
+
+    top = Path(run_git(["rev-parse", "--show-toplevel"], cwd=cwd))
+    names = _split_z(
+        run_git(["diff", "--name-only", "--no-renames", "-z", ref, "--"], cwd=top)
+    )
+    names += _split_z(
+        run_git(["ls-files", "--others", "--exclude-standard", "-z"], cwd=top)
+    )
+    return [top / name for name in dict.fromkeys(names)]
+
+
+def files_mentioning(
+    needles: Iterable[str], *, cwd: Path, pathspec: Iterable[str]
+) -> list[Path]:
+    """Tracked or untracked files under `pathspec` containing any of `needles`.
+
+    One `git grep` over the working tree, run in (and relative to) `cwd`;
+    paths are returned absolute.
+    """
+
+    args = ["grep", "-l", "-z", "-F", "--untracked"]
+    for needle in needles:
+        args += ["-e", needle]
+    if "-e" not in args:
+        return []
+    result = subprocess.run(
+        ["git", *args, "--", *pathspec],
+        cwd=cwd,
+        check=False,
+        text=True,
+        capture_output=True,
+    )
+    # 1 means nothing matched.
+    if result.returncode not in (0, 1):
+        raise RuntimeError(result.stderr.strip() or "git grep failed")
+    return [cwd / name for name in _split_z(result.stdout)]
+
+
+class GitObjectReader:
+    """Reads objects through one long-lived `git cat-file --batch` process.
+
+    Every `read` is a request on the same pipe, so comparing many refs (or
+    every commit of a history) forks git once instead of once per blob. The
+    process starts on the first read; use the reader as a context manager or
+    call `close`.
+    """
+
+    def __init__(self, cwd: Path) -> None:
+        self.cwd = cwd
+        self.subprocess_count = 0
+        self.bytes_read = 0
+        self._process: subprocess.Popen[bytes] | None = None
+
+    def __enter__(self) -> GitObjectReader:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _pipe(self) -> subprocess.Popen[bytes]:
+        if self._process is None:
+            self._process = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                cwd=self.cwd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+            self.subprocess_count += 1
+        return self._process
+
+    def read_object(self, spec: str) -> tuple[str, str, bytes] | None:
+        """Return (object id, type, contents) for `spec`, or None if it does not exist.
+
+        `spec` is anything `git rev-parse` accepts, e.g. `HEAD~2:data/tools.yaml`.
+        """
+
+        if "\n" in spec:
+            raise ValueError(f"invalid object name {spec!r}")
+        process = self._pipe()
+        assert process.stdin is not None and process.stdout is not None
+        try:
+            process.stdin.write(spec.encode() + b"\n")
+            process.stdin.flush()
+        except BrokenPipeError as exc:
+            raise RuntimeError("git cat-file exited") from exc
+        header = process.stdout.readline()
+        if not header:
+            raise RuntimeError("git cat-file exited")
+        if header.endswith((b" missing\n", b" ambiguous\n")):
+            return None
+        oid, kind, size = header.decode().split()
+        data = process.stdout.read(int(size))
+        process.stdout.read(1)  # the newline after the contents
+        self.bytes_read += len(data)
+        return oid, kind, data
+
+    def read_blob(self, ref: str, path: str) -> bytes | None:
+        """Contents of `path` (relative to the repository root) at `ref`, or None."""
+
+        found = self.read_object(f"{ref}:{path}")
+        if found is None or found[1] != "blob":
+            return None
+        return found[2]
+
+    def resolve_commit(self, ref: str) -> str | None:
+        found = self.read_object(f"{ref}^{{commit}}")
+        return found[0] if found is not None else None
+
+    def close(self) -> None:
+        if self._process is None:
+            return
+        assert self._process.stdin is not None
+        self._process.stdin.close()
+        self._process.wait()
+        if self._process.stdout is not None:
+            self._process.stdout.close()
+        self._process = None
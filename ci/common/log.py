@@ -0,0 +1,34 @@
+"""structlog setup shared by the ci/ scripts (structlog is imported lazily)."""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+from common.deps import require
+
+if TYPE_CHECKING:
+    import structlog
+
+
+def configure_logging(name: str) -> structlog.stdlib.BoundLogger:
+    structlog = require("structlog", package="structlog", pip_name="structlog")
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    structlog.configure(
+        processors=[
+            structlog.stdlib.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.StackInfoRenderer(),
+            structlog.processors.format_exc_info,
+            structlog.dev.ConsoleRenderer(),
+        ],
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+        cache_logger_on_first_use=True,
+    )
+    return structlog.get_logger(name)
+
+
+def get_logger(name: str) -> structlog.stdlib.BoundLogger:
+    structlog = require("structlog", package="structlog", pip_name="structlog")
+    return structlog.get_logger(name)
@@ -0,0 +1,143 @@
+"""Per-phase timings and counters for the ci/ scripts.
+
+A `Metrics` instance collects wall time per phase, plain counters and the
+slowest-N files per category. It can be emitted as structlog events and
+written to a JSON or OpenMetrics text file (`--metrics-out`).
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Generator, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class Metrics:
+    script: str
+    top_n: int = 10
+    phases: dict[str, float] = field(default_factory=dict)
+    counters: dict[str, int] = field(default_factory=dict)
+    slowest: dict[str, list[tuple[float, str]]] = field(default_factory=dict)
+
+    @contextmanager
+    def phase(self, name: str) -> Generator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def timed_iter(self, name: str, iterable: Iterable[T]) -> Iterator[T]:
+        """Yield from `iterable`, charging only the time spent producing items."""
+
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add_time(name, time.perf_counter() - start)
+                return
+            self.add_time(name, time.perf_counter() - start)
+            yield item
+
+    def add_time(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def count(self, name: str, value: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def record_file(self, category: str, path: Path | str, seconds: float) -> None:
+        heap = self.slowest.setdefault(category, [])
+        item = (seconds, str(path))
+        if len(heap) < self.top_n:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "script": self.script,
+            "phases_seconds": {k: round(v, 6) for k, v in sorted(self.phases.items())},
+            "counters": dict(sorted(self.counters.items())),
+            "slowest": {
+                category: [
+                    {"path": path, "seconds": round(seconds, 6)}
+                    for seconds, path in sorted(heap, reverse=True)
+                ]
+                for category, heap in sorted(self.slowest.items())
+            },
+        }
+
+    def emit(self, log: Any) -> None:
+        log.info(
+            "phase timings",
+            **{f"{name}_ms": round(v * 1000, 1) for name, v in self.phases.items()},
+        )
+        if self.counters:
+            log.info("counters", **self.counters)
+        for category, files in self.as_dict()["slowest"].items():
+            log.info("slowest files", category=category, files=files)
+
+    def render_openmetrics(self) -> str:
+        script = _label(self.script)
+        lines = ["# TYPE ci_phase_seconds gauge"]
+        for name, seconds in sorted(self.phases.items()):
+            lines.append(
+                f'ci_phase_seconds{{script="{script}",phase="{_label(name)}"}} {seconds:.6f}'
+            )
+        lines.append("# TYPE ci_events counter")
+        for name, value in sorted(self.counters.items()):
+            lines.append(
+                f'ci_events_total{{script="{script}",name="{_label(name)}"}} {value}'
+            )
+        lines.append("# TYPE ci_file_seconds gauge")
+        for category, heap in sorted(self.slowest.items()):
+            for seconds, path in sorted(heap, reverse=True):
+                lines.append(
+                    f'ci_file_seconds{{script="{script}",category="{_label(category)}",'
+                    f'path="{_label(path)}"}} {seconds:.6f}'
+                )
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Path) -> None:
+        """Write JSON for `*.json`, OpenMetrics text for anything else."""
+
+        if path.suffix.lower() == ".json":
+            text = json.dumps(self.as_dict(), indent=4) + "\n"
+        else:
+            text = self.render_openmetrics()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+@contextmanager
+def profile_to(path: Path | None) -> Generator[None]:
+    """Run the block under cProfile and dump pstats to `path` (no-op if None)."""
+
+    if path is None:
+        yield
+        return
+
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(path)
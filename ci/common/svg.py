@@ -0,0 +1,255 @@
+"""Pure-Python SVG minification (standard library only).
+
+`minify_svg` drops what browsers never render: the XML declaration, comments,
+editor metadata (Inkscape, Sodipodi, Illustrator, Sketch, ...), unused
+`<defs>` entries and whitespace between elements. It also rounds numbers in
+geometry attributes to `precision` decimals. Text content, `<style>` and
+anything under `xml:space="preserve"` are left as they are.
+"""
+
+from __future__ import annotations
+
+import io
+import re
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+from typing import Generator, Iterator, cast
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+
+# Namespaces of editor bookkeeping; elements and attributes in them are dropped.
+EDITOR_NAMESPACES = frozenset(
+    {
+        "http://www.inkscape.org/namespaces/inkscape",
+        "http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd",
+        "http://ns.adobe.com/AdobeIllustrator/10.0/",
+        "http://ns.adobe.com/AdobeSVGViewerExtensions/3.0/",
+        "http://ns.adobe.com/Extensibility/1.0/",
+        "http://ns.adobe.com/Flows/1.0/",
+        "http://ns.adobe.com/GenericCustomNamespace/1.0/",
+        "http://ns.adobe.com/ImageReplacement/1.0/",
+        "http://ns.adobe.com/SaveForWeb/1.0/",
+        "http://ns.adobe.com/Variables/1.0/",
+        "http://ns.adobe.com/XPath/1.0/",
+        "http://www.bohemiancoding.com/sketch/ns",
+        "http://www.serif.com/",
+    }
+)
+
+# Attributes holding numbers (or lists of them) that are safe to round.
+NUMERIC_ATTRIBUTES = frozenset(
+    {
+        "cx",
+        "cy",
+        "d",
+        "dx",
+        "dy",
+        "fill-opacity",
+        "font-size",
+        "fx",
+        "fy",
+        "gradientTransform",
+        "height",
+        "offset",
+        "opacity",
+        "patternTransform",
+        "points",
+        "r",
+        "rx",
+        "ry",
+        "stop-opacity",
+        "stroke-dasharray",
+        "stroke-dashoffset",
+        "stroke-miterlimit",
+        "stroke-opacity",
+        "stroke-width",
+        "transform",
+        "viewBox",
+        "width",
+        "x",
+        "x1",
+        "x2",
+        "y",
+        "y1",
+        "y2",
+    }
+)
+
+# Elements whose whitespace is rendered.
+TEXT_ELEMENTS = frozenset({"text", "tspan", "textPath", "style", "title", "desc"})
+
+_NUMBER = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+_URL_REF = re.compile(r"url\(\s*['\"]?#([^)'\"\s]+)")
+_HASH_REF = re.compile(r"#([A-Za-z_][\w.:-]*)")
+_TOKEN = re.compile(r"[^\s;,.()]+")
+
+
+class SvgError(ValueError):
+    """The input is not well-formed XML."""
+
+
+def _namespace(tag: str) -> str:
+    return tag[1:].partition("}")[0] if tag.startswith("{") else ""
+
+
+def _local(tag: str) -> str:
+    return tag.rpartition("}")[2]
+
+
+def _format_number(match: re.Match[str], *, precision: int) -> str:
+    token = match[0]
+    # Integers are left alone: path arc flags may be packed ("a1 1 0 011 1").
+    if "." not in token and "e" not in token.lower():
+        return token
+    if re.match(r"[-+]?0\d", token):
+        return token
+    value = round(float(token), precision)
+    text = f"{value:.{precision}f}".rstrip("0").rstrip(".")
+    if text in {"", "-0"}:
+        text = "0"
+    if text.startswith("0."):
+        text = text[1:]
+    elif text.startswith("-0."):
+        text = "-" + text[2:]
+    rest = match.string[match.end() :]
+    if rest.startswith(".") and "." not in text:
+        # "5.0.5" must not become "5.5".
+        text += " "
+    return text
+
+
+def _round_numbers(value: str, precision: int) -> str:
+    return _NUMBER.sub(lambda m: _format_number(m, precision=precision), value)
+
+
+def _iter_with_parents(
+    element: ET.Element,
+) -> Iterator[tuple[ET.Element, ET.Element]]:
+    for child in list(element):
+        yield element, child
+        yield from _iter_with_parents(child)
+
+
+def _referenced_ids(root: ET.Element) -> set[str]:
+    """Ids something may point at; deliberately generous."""
+
+    ids: set[str] = set()
+    for element in root.iter():
+        for name, value in element.attrib.items():
+            if name == "id":
+                continue
+            ids.update(_URL_REF.findall(value))
+            ids.update(_HASH_REF.findall(value))
+            # aria-labelledby="a b", begin="anim.end" and friends.
+            ids.update(_TOKEN.findall(value))
+        if element.text and _local(element.tag) == "style":
+            ids.update(_URL_REF.findall(element.text))
+            ids.update(_HASH_REF.findall(element.text))
+    return ids
+
+
+def _drop_unused_defs(root: ET.Element) -> None:
+    # Removing a gradient can orphan the one it inherited from, so repeat.
+    while True:
+        referenced = _referenced_ids(root)
+        removed = False
+        for defs in [e for e in root.iter() if _local(e.tag) == "defs"]:
+            for child in list(defs):
+                ids = {e.get("id") for e in child.iter()} - {None}
+                if ids and not ids & referenced:
+                    defs.remove(child)
+                    removed = True
+        if not removed:
+            break
+    for parent, child in list(_iter_with_parents(root)):
+        if _local(child.tag) == "defs" and len(child) == 0 and not child.get("id"):
+            parent.remove(child)
+
+
+def _strip_whitespace(element: ET.Element, *, preserve: bool) -> None:
+    if element.get(XML_SPACE) == "preserve":
+        preserve = True
+    if not preserve and element.text and not element.text.strip():
+        element.text = None
+    for child in element:
+        if not preserve and child.tail and not child.tail.strip():
+            child.tail = None
+        _strip_whitespace(
+            child, preserve=preserve or _local(child.tag) in TEXT_ELEMENTS
+        )
+
+
+@contextmanager
+def _document_prefixes(namespaces: dict[str, str]) -> Generator[None]:
+    """Serialize with the document's own prefixes, then restore ElementTree's.
+
+    `ET.register_namespace` is the only way to pick prefixes and it changes
+    a module-wide map, so the map is put back once the document is written.
+    """
+
+    # ElementTree keeps the registry (uri -> prefix) as a private module
+    # attribute that is not in its type stubs.
+    registry: dict[str, str] = vars(ET)["_namespace_map"]
+    saved = dict(registry)
+    try:
+        # The default namespace goes last so it wins over e.g. xmlns:svg.
+        for prefix, uri in sorted(namespaces.items(), key=lambda item: item[0] == ""):
+            if uri in EDITOR_NAMESPACES:
+                continue
+            try:
+                ET.register_namespace(prefix, uri)
+            except ValueError:
+                # Prefixes such as "ns0" are reserved by ElementTree.
+                pass
+        yield
+    finally:
+        registry.clear()
+        registry.update(saved)
+
+
+def minify_svg(data: bytes, *, precision: int = 3) -> bytes:
+    """Return a smaller, rendering-equivalent SVG document as UTF-8.
+
+    `data` is parsed as XML, so the encoding in its declaration is honored.
+    """
+
+    namespaces: dict[str, str] = {}
+    root: ET.Element | None = None
+    try:
+        for event, item in ET.iterparse(io.BytesIO(data), events=("start-ns", "start")):
+            if event == "start-ns":
+                # The stubs type every event's item as an Element.
+                prefix, uri = cast("tuple[str, str]", item)
+                namespaces.setdefault(prefix, uri)
+            elif root is None:
+                root = item
+    except ET.ParseError as exc:
+        raise SvgError(str(exc)) from exc
+    if root is None:
+        raise SvgError("no root element")
+
+    for parent, child in list(_iter_with_parents(root)):
+        if not isinstance(child.tag, str):
+            continue
+        if (
+            _namespace(child.tag) in EDITOR_NAMESPACES
+            or child.tag == f"{{{SVG_NS}}}metadata"
+        ):
+            parent.remove(child)
+
+    for element in root.iter():
+        for name in list(element.attrib):
+            if _namespace(name) in EDITOR_NAMESPACES:
+                del element.attrib[name]
+            elif name in NUMERIC_ATTRIBUTES:
+                element.set(name, _round_numbers(element.attrib[name], precision))
+
+    _drop_unused_defs(root)
+    _strip_whitespace(root, preserve=False)
+
+    with _document_prefixes(namespaces):
+        # ElementTree writes "<a />"; markup characters inside values are
+        # escaped, so the space can only come from a self-closing tag.
+        text = ET.tostring(root, encoding="unicode").replace(" />", "/>")
+    return text.encode("utf-8")
@@ -0,0 +1,32 @@
+"""How tool bundles read their `toolbox` settings from front matter.
+
+Shared by `ci/build_tools_data.py`, which publishes the values, and
+`ci/validate_front_matter.py`, which checks them.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+
+def toolbox_section(fm: dict[str, Any]) -> dict[str, Any]:
+    """The `toolbox` mapping, falling back to the legacy `tool` key."""
+
+    if isinstance(fm.get("toolbox"), dict):
+        return fm["toolbox"]
+    if isinstance(fm.get("tool"), dict):
+        return fm["tool"]
+    return {}
+
+
+def tool_file(fm: dict[str, Any], toolbox: dict[str, Any]) -> str:
+    """The tool file: the `tool-file` resource, else `toolbox.file`, else tool.html."""
+
+    resources = fm.get("resources")
+    if isinstance(resources, list):
+        for item in resources:
+            if not isinstance(item, dict):
+                continue
+            if item.get("name") == "tool-file" and item.get("src"):
+                return str(item["src"])
+    return str(toolbox.get("file") or "tool.html")
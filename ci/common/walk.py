@@ -0,0 +1,111 @@
+"""Layout-aware discovery of Hugo leaf bundles (`<dir>/index.md`).
+
+A directory holding an `index.md` is a leaf bundle; Hugo treats everything
+below it as page resources, so the walk stops there instead of descending
+into `images/` and friends. Results stream out in the same order as
+`sorted(root.rglob("index.md"))` would give for the bundles it finds.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+INDEX_NAME = "index.md"
+
+# Resource directories that never hold bundles of their own.
+ASSET_DIRS = frozenset({"images"})
+
+
+@dataclass(frozen=True)
+class DirListing:
+    mtime_ns: int
+    has_index: bool
+    subdirs: tuple[str, ...]
+
+
+# Directory path -> listing; reused while the directory's mtime is unchanged.
+DirCache = dict[str, DirListing]
+
+
+def _list_dir(path: Path, dir_cache: DirCache | None) -> DirListing | None:
+    key = str(path)
+    try:
+        # Stat before listing so a concurrent change invalidates the entry.
+        mtime_ns = path.stat().st_mtime_ns
+    except (FileNotFoundError, NotADirectoryError):
+        if dir_cache is not None:
+            dir_cache.pop(key, None)
+        return None
+
+    if dir_cache is not None:
+        cached = dir_cache.get(key)
+        if cached is not None and cached.mtime_ns == mtime_ns:
+            return cached
+
+    has_index = False
+    subdirs: list[str] = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.name == INDEX_NAME:
+                    has_index = has_index or entry.is_file()
+                elif (
+                    entry.is_dir(follow_symlinks=False)
+                    and not entry.name.startswith(".")
+                    and entry.name not in ASSET_DIRS
+                ):
+                    subdirs.append(entry.name)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+    listing = DirListing(
+        mtime_ns=mtime_ns, has_index=has_index, subdirs=tuple(sorted(subdirs))
+    )
+    if dir_cache is not None:
+        dir_cache[key] = listing
+    return listing
+
+
+def iter_bundle_index_files(
+    root: Path, *, dir_cache: DirCache | None = None
+) -> Iterator[Path]:
+    """Yield every leaf bundle `index.md` under `root`, in sorted path order.
+
+    Pass the same `dir_cache` across calls to skip re-listing directories
+    whose mtime has not changed.
+    """
+
+    listing = _list_dir(root, dir_cache)
+    if listing is None:
+        return
+    if listing.has_index:
+        yield root / INDEX_NAME
+        return
+    for name in listing.subdirs:
+        yield from iter_bundle_index_files(root / name, dir_cache=dir_cache)
+
+
+def bundle_index_for(path: Path, *, root: Path) -> Path | None:
+    """The `index.md` of the leaf bundle under `root` that holds `path`.
+
+    `path` may be that `index.md` itself (returned as is) or any file inside
+    the bundle, as pre-commit passes them. Only `root` and the directories
+    below it are searched; None if `path` is in no bundle there. The result
+    is relative when `path` is.
+    """
+
+    root = root.resolve()
+    if not path.resolve().is_relative_to(root):
+        return None
+    if path.name == INDEX_NAME:
+        return path
+    for parent in path.parents:
+        candidate = parent / INDEX_NAME
+        if candidate.is_file():
+            return candidate
+        if parent.resolve() == root:
+            break
+    return None
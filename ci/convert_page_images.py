@@ -12,47 +12,62 @@
 from __future__ import annotations
 
 import argparse
-import logging
+import contextlib
+import io
+import json
+import math
+import os
+import re
+import sys
+import time
+from collections import deque
 from dataclasses import dataclass, field
+from functools import cache
 from pathlib import Path
-from typing import Any, Iterable, Sequence
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Sequence
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor, Future
 
-try:
     import structlog
-except (
-    ModuleNotFoundError
-) as exc:  # pragma: no cover - dependency should be installed in CI
-    raise SystemExit(
-        "Missing dependency 'structlog'. "
-        "Install it (e.g. `pip install structlog`) or run via a PEP-723 aware runner (e.g. `uv run`)."
-    ) from exc
-
-try:
-    import yaml
-except (
-    ModuleNotFoundError
-) as exc:  # pragma: no cover - dependency should be installed in CI
-    raise SystemExit(
-        "Missing dependency 'PyYAML'. "
-        "Install it (e.g. `pip install pyyaml`) or run via a PEP-723 aware runner (e.g. `uv run`)."
-    ) from exc
-
-try:
-    from PIL import Image, UnidentifiedImageError
-except (
-    ModuleNotFoundError
-) as exc:  # pragma: no cover - dependency should be installed in CI
-    raise SystemExit(
-        "Missing dependency 'Pillow'. "
-        "Install it (e.g. `pip install pillow`) or run via a PEP-723 aware runner (e.g. `uv run`)."
-    ) from exc
 
+from common.cas import ContentCache, hash_file
+from common.deps import require
+from common.front_matter import (
+    FrontMatterError,
+    parse_front_matter_text,
+    read_front_matter_text,
+)
+from common.git import changed_files, files_mentioning
+from common.log import configure_logging
+from common.metrics import Metrics, profile_to
+from common.svg import SvgError, minify_svg
+from common.walk import INDEX_NAME, bundle_index_for, iter_bundle_index_files
 
 IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".svg"}
 
+# Pillow's slowest, best-compressing WebP method.
+WEBP_METHOD = 6
+
+# Bump when the encoder output for the same source and settings changes, so
+# stale entries in the WebP cache are no longer hit.
+WEBP_CACHE_VERSION = 2
+
+# Bump when `minify_svg` output changes, so cached SVGs are minified again.
+SVG_MINIFY_VERSION = 1
 
-class FrontMatterError(ValueError):
-    pass
+# Animated sources beyond these are rejected rather than encoded; pixels
+# count every frame, i.e. width * height * frames.
+MAX_FRAMES = 1000
+MAX_PIXELS = 1 << 28
+
+# Estimated decode memory the encode workers may use at once, see
+# `estimate_decode_bytes`.
+MEMORY_BUDGET_MB = 2048
+MB = 1024 * 1024
+
+# Responsive variants written by `--widths`: `<stem>-<width>w.webp`.
+_VARIANT_NAME = re.compile(r"(.+)-\d+w\.webp")
 
 
 @dataclass
@@ -60,82 +75,38 @@ class ProcessingStats:
     files_processed: int = 0
     images_converted: int = 0
     errors: list[str] = field(default_factory=list)
+    # Cache key -> quality picked by a target search, see `save_choices`.
+    choices: dict[str, int] = field(default_factory=dict)
+    # `.webp` path -> responsive variants entry, see `write_variant_manifest`.
+    variants: dict[Path, dict[str, Any] | None] = field(default_factory=dict)
+    metrics: Metrics = field(default_factory=lambda: Metrics("convert_page_images"))
 
 
 @dataclass(frozen=True)
 class FrontMatterBlock:
     data: dict[str, Any]
-    start_line: int
     end_line: int
     block_text: str
-    newline: str
-    trailing_newline: bool
-    lines: list[str]
-
-
-def _configure_logging() -> structlog.stdlib.BoundLogger:
-    logging.basicConfig(level=logging.INFO, format="%(message)s")
-    structlog.configure(
-        processors=[
-            structlog.stdlib.add_log_level,
-            structlog.processors.TimeStamper(fmt="iso"),
-            structlog.processors.StackInfoRenderer(),
-            structlog.processors.format_exc_info,
-            structlog.dev.ConsoleRenderer(),
-        ],
-        logger_factory=structlog.stdlib.LoggerFactory(),
-        wrapper_class=structlog.stdlib.BoundLogger,
-        cache_logger_on_first_use=True,
-    )
-    return structlog.get_logger("ci.convert_page_images")
 
 
 def _detect_newline(text: str) -> str:
     return "\r\n" if "\r\n" in text else "\n"
 
 
-def _parse_front_matter(md_text: str) -> FrontMatterBlock | None:
-    lines = md_text.splitlines()
-    if not lines or lines[0].strip() != "---":
+def parse_front_matter(index_md: Path) -> FrontMatterBlock | None:
+    front_matter = read_front_matter_text(index_md)
+    if front_matter is None:
         return None
 
-    end = None
-    for idx in range(1, len(lines)):
-        if lines[idx].strip() == "---":
-            end = idx
-            break
-    if end is None:
-        raise FrontMatterError(
-            "Front matter starts with '---' but no closing '---' found."
-        )
-
-    block_text = "\n".join(lines[1:end])
-    if block_text.strip():
-        try:
-            data = yaml.safe_load(block_text)
-        except yaml.YAMLError as exc:
-            raise FrontMatterError("Front matter YAML failed to parse.") from exc
-    else:
-        data = {}
-
-    if data is None:
-        data = {}
-    if not isinstance(data, dict):
-        raise FrontMatterError("Front matter YAML must be a mapping.")
-
     return FrontMatterBlock(
-        data=data,
-        start_line=0,
-        end_line=end,
-        block_text=block_text,
-        newline=_detect_newline(md_text),
-        trailing_newline=md_text.endswith(("\n", "\r\n")),
-        lines=lines,
+        data=parse_front_matter_text(front_matter.block_text),
+        end_line=front_matter.end_line,
+        block_text=front_matter.block_text,
     )
 
 
 def _iter_index_files(root: Path) -> Iterable[Path]:
-    yield from sorted(root.rglob("index.md"))
+    yield from iter_bundle_index_files(root)
 
 
 def _collect_image_paths(value: Any) -> list[str]:
@@ -189,90 +160,517 @@ def _resolve_image_path(value: str, *, index_md: Path, repo_root: Path) -> Path:
     return candidate
 
 
+def _encode_webp_bytes(image: Any, quality: int) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="WEBP", quality=quality, method=WEBP_METHOD)
+    return buffer.getvalue()
+
+
+def _psnr(reference: Any, data: bytes) -> float:
+    """Peak signal-to-noise ratio (dB) of encoded `data` against `reference`."""
+
+    pil = require("PIL.Image", package="Pillow", pip_name="pillow")
+    image_chops = require("PIL.ImageChops", package="Pillow", pip_name="pillow")
+    image_stat = require("PIL.ImageStat", package="Pillow", pip_name="pillow")
+    with pil.open(io.BytesIO(data)) as decoded:
+        diff = image_chops.difference(reference, decoded.convert(reference.mode))
+    sum2 = image_stat.Stat(diff).sum2
+    mse = sum(sum2) / (len(sum2) * reference.width * reference.height)
+    return math.inf if mse == 0 else 10 * math.log10(255**2 / mse)
+
+
+def _search_quality(image: Any, options: EncodeOptions) -> tuple[int, bytes, int]:
+    """Binary search `1..options.quality` for the setting that meets the target.
+
+    With `max_bytes` that is the highest quality that fits, with `min_psnr`
+    the lowest quality that is close enough. The decoded `image` is reused
+    for every attempt. Returns (quality, encoded bytes, attempts); if no
+    attempt met the target the smallest (or best) setting tried is used.
+    """
+
+    low, high = 1, options.quality
+    best: tuple[int, bytes] | None = None
+    fallback: tuple[int, bytes] | None = None
+    attempts = 0
+    while low <= high and attempts < options.max_attempts:
+        quality = (low + high) // 2
+        data = _encode_webp_bytes(image, quality)
+        attempts += 1
+        if options.max_bytes is not None:
+            if len(data) <= options.max_bytes:
+                best, low = (quality, data), quality + 1
+            else:
+                high = quality - 1
+                if fallback is None or quality < fallback[0]:
+                    fallback = (quality, data)
+        else:
+            assert options.min_psnr is not None  # has_target
+            if _psnr(image, data) >= options.min_psnr:
+                best, high = (quality, data), quality - 1
+            else:
+                low = quality + 1
+                if fallback is None or quality > fallback[0]:
+                    fallback = (quality, data)
+    chosen = best or fallback
+    assert chosen is not None  # max_attempts >= 1
+    return chosen[0], chosen[1], attempts
+
+
+def _variant_path(target_path: Path, width: int) -> Path:
+    return target_path.with_name(f"{target_path.stem}-{width}w.webp")
+
+
+def _write_variants(
+    image: Any, target_path: Path, widths: Iterable[int], *, quality: int
+) -> int:
+    """Write `<stem>-<width>w.webp` for each width narrower than `image`.
+
+    Widths are produced largest first; `Image.reduce` shrinks by integer
+    factors cheaply before the final Lanczos resize, and each reduction is
+    reused for the narrower widths. Returns the number of files written.
+    """
+
+    pil = require("PIL.Image", package="Pillow", pip_name="pillow")
+    written = 0
+    current = image
+    for width in sorted(set(widths), reverse=True):
+        path = _variant_path(target_path, width)
+        if width >= image.width or path.exists():
+            continue
+        factor = current.width // width
+        if factor >= 2:
+            current = current.reduce(factor)
+        height = max(1, round(image.height * width / image.width))
+        resized = current.resize((width, height), pil.Resampling.LANCZOS)
+        resized.save(path, format="WEBP", quality=quality, method=WEBP_METHOD)
+        written += 1
+    return written
+
+
+def _ensure_variants(job: ImageJob, options: EncodeOptions) -> int:
+    """Write any missing variants for an image whose `.webp` already exists."""
+
+    pil = require("PIL.Image", package="Pillow", pip_name="pillow")
+    source = job.source_path if job.source_path.exists() else job.target_path
+    with pil.open(source) as image:
+        if getattr(image, "is_animated", False):
+            return 0
+        widths = [
+            width
+            for width in options.widths
+            if width < image.width
+            and not _variant_path(job.target_path, width).exists()
+        ]
+        if not widths:
+            return 0
+        if image.format == "JPEG":
+            # Let libjpeg decode at a reduced scale that still covers the widest.
+            scale = max(widths) / image.width
+            image.draft("RGB", (max(widths), math.ceil(image.height * scale)))
+        image.load()
+        if image.mode not in {"RGB", "RGBA"}:
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+        return _write_variants(image, job.target_path, widths, quality=options.quality)
+
+
+def _save_animation(
+    image: Any,
+    target_path: Path,
+    *,
+    quality: int,
+    max_frames: int,
+    max_pixels: int,
+) -> int:
+    """Encode every frame of an animated `image` to an animated WebP.
+
+    Frames are decoded one at a time, both by the metadata pass here and by
+    Pillow's animation encoder, so memory does not grow with the frame count.
+    Returns the number of frames written.
+    """
+
+    # A GIF without a loop extension plays once; WebP's 0 means forever.
+    loop = image.info.get("loop", 1)
+    frame_pixels = image.width * image.height
+    durations: list[int] = []
+    while True:
+        durations.append(int(image.info.get("duration", 0)))
+        if len(durations) > max_frames:
+            raise ValueError(
+                f"Animation has more than {max_frames} frames (--max-frames)."
+            )
+        if len(durations) * frame_pixels > max_pixels:
+            raise ValueError(
+                f"Animation exceeds {max_pixels} pixels across its frames (--max-pixels)."
+            )
+        try:
+            image.seek(image.tell() + 1)
+        except EOFError:
+            break
+    image.seek(0)
+    image.save(
+        target_path,
+        format="WEBP",
+        save_all=True,
+        duration=durations,
+        loop=loop,
+        quality=quality,
+        method=WEBP_METHOD,
+    )
+    return len(durations)
+
+
+@dataclass(frozen=True)
+class Conversion:
+    quality: int
+    attempts: int = 1
+    variants: int = 0
+    # Bytes of pixel data actually decoded (one frame for animations).
+    decoded_bytes: int = 0
+
+
+def _pixel_bytes(image: Any) -> int:
+    band_bytes = 2 if "16" in image.mode else 4 if image.mode in {"I", "F"} else 1
+    return image.width * image.height * len(image.getbands()) * band_bytes
+
+
+def _fit(size: tuple[int, int], max_dimension: int | None) -> tuple[int, int]:
+    width, height = size
+    if max_dimension is None or max(width, height) <= max_dimension:
+        return width, height
+    scale = max_dimension / max(width, height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def estimate_decode_bytes(source_path: Path, options: EncodeOptions) -> int:
+    """Estimate the peak pixel memory of encoding `source_path`, from its header.
+
+    Counts the decoded source (at the scale a JPEG draft decode would pick
+    under `max_dimension`) plus the RGB(A) image handed to the encoder and
+    the encoder's own copy. Returns 0 when the header cannot be read; the
+    encode reports that error itself.
+    """
+
+    pil = require("PIL.Image", package="Pillow", pip_name="pillow")
+    try:
+        with pil.open(source_path) as image:
+            decoded = _pixel_bytes(image)
+            out_width, out_height = _fit(image.size, options.max_dimension)
+            if image.format == "JPEG" and out_width < image.width:
+                reduction = 1
+                # Mirrors the draft scale picked in `_convert_to_webp`.
+                while reduction < 8 and image.width // (reduction * 2) >= 2 * out_width:
+                    reduction *= 2
+                decoded //= reduction * reduction
+            if getattr(image, "is_animated", False):
+                # The previous frame is kept for disposal next to the current one.
+                decoded *= 2
+    except (OSError, ValueError):
+        return 0
+    return decoded + 2 * out_width * out_height * 4
+
+
 def _convert_to_webp(
     source_path: Path,
     target_path: Path,
     *,
     quality: int,
-) -> None:
+    options: EncodeOptions | None = None,
+    search: bool = True,
+) -> Conversion:
+    """Encode `source_path` to `target_path` with the settings in `options`.
+
+    When `options` sets a target (and `search` is left on), `quality` is an
+    upper bound and the setting is searched for. Images larger than
+    `max_dimension` are downscaled while decoding (JPEGs at reduced scale).
+    Responsive `widths` are derived from the same decoded image. Animated
+    sources keep their frames, durations and loop count; they are encoded
+    at `quality` as is, without a search, downscaling or variants.
+    """
+
     if source_path.suffix.lower() == ".svg":
         raise ValueError("SVG conversion is not supported by Pillow.")
+    if options is None:
+        options = EncodeOptions(quality=quality)
+    pil = require("PIL.Image", package="Pillow", pip_name="pillow")
     target_path.parent.mkdir(parents=True, exist_ok=True)
     try:
-        with Image.open(source_path) as image:
+        with pil.open(source_path) as image:
+            if getattr(image, "is_animated", False):
+                _save_animation(
+                    image,
+                    target_path,
+                    quality=quality,
+                    max_frames=options.max_frames,
+                    max_pixels=options.max_pixels,
+                )
+                return Conversion(quality=quality, decoded_bytes=_pixel_bytes(image))
+            size = _fit(image.size, options.max_dimension)
+            if size != image.size:
+                # JPEGs decode straight to a smaller scale (at least twice the
+                # output size); the rest is `reduce` followed by a resize.
+                image.draft(None, (size[0] * 2, size[1] * 2))
             image.load()
+            decoded_bytes = _pixel_bytes(image)
+            if size != image.size:
+                image = image.resize(size, pil.Resampling.LANCZOS, reducing_gap=2.0)
             if image.mode not in {"RGB", "RGBA"}:
                 image = image.convert("RGBA" if "transparency" in image.info else "RGB")
-            image.save(
-                target_path,
-                format="WEBP",
+            attempts = 1
+            if not (search and options.has_target):
+                image.save(
+                    target_path,
+                    format="WEBP",
+                    quality=quality,
+                    method=WEBP_METHOD,
+                )
+            else:
+                quality, data, attempts = _search_quality(image, options)
+                target_path.write_bytes(data)
+            variants = _write_variants(
+                image, target_path, options.widths, quality=quality
+            )
+            return Conversion(
                 quality=quality,
-                method=6,
+                attempts=attempts,
+                variants=variants,
+                decoded_bytes=decoded_bytes,
             )
-    except UnidentifiedImageError as exc:
+    except pil.UnidentifiedImageError as exc:
         raise ValueError("Unsupported image format for conversion.") from exc
 
 
+def _replace_paths(block_text: str, replacements: dict[str, str]) -> str:
+    for old, new in replacements.items():
+        block_text = block_text.replace(old, new)
+    return block_text
+
+
 def _build_updated_text(
+    md_text: str,
     front_matter: FrontMatterBlock,
     replacements: dict[str, str],
 ) -> str | None:
-    updated_block = front_matter.block_text
-    for old, new in replacements.items():
-        updated_block = updated_block.replace(old, new)
-
+    updated_block = _replace_paths(front_matter.block_text, replacements)
     if updated_block == front_matter.block_text:
         return None
 
-    new_lines = (
-        front_matter.lines[:1]
-        + updated_block.splitlines()
-        + front_matter.lines[front_matter.end_line :]
-    )
-    newline = front_matter.newline
+    lines = md_text.splitlines()
+    new_lines = lines[:1] + updated_block.splitlines() + lines[front_matter.end_line :]
+    newline = _detect_newline(md_text)
     updated_text = newline.join(new_lines)
-    if front_matter.trailing_newline and not updated_text.endswith(newline):
+    if md_text.endswith(("\n", "\r\n")) and not updated_text.endswith(newline):
         updated_text += newline
     return updated_text
 
 
-def _process_index_file(
-    index_md: Path,
-    *,
-    repo_root: Path,
-    quality: int,
-    log: structlog.stdlib.BoundLogger,
-    stats: ProcessingStats,
-) -> None:
-    stats.files_processed += 1
+@dataclass(frozen=True)
+class ImageJob:
+    """One front matter image reference resolved to a file on disk."""
+
+    image_path: str
+    source_path: Path
+    target_path: Path
+
+
+@dataclass(frozen=True)
+class EncodeOptions:
+    """Encoder settings shared by every image; picklable for worker processes.
+
+    Setting `max_bytes` or `min_psnr` turns `quality` into an upper bound and
+    searches for a per-image setting, trying at most `max_attempts` encodes.
+    Non-empty `widths` also writes a `<stem>-<width>w.webp` variant for each
+    width narrower than the image. `max_dimension` bounds the longer side of
+    the output; larger images are downscaled while decoding.
+    """
+
+    quality: int = 80
+    cache: ContentCache | None = None
+    max_bytes: int | None = None
+    min_psnr: float | None = None
+    max_attempts: int = 7
+    # Responsive variant widths; empty disables variants.
+    widths: tuple[int, ...] = ()
+    max_frames: int = MAX_FRAMES
+    max_pixels: int = MAX_PIXELS
+    # Downscale anything larger on decode; None keeps the full size.
+    max_dimension: int | None = None
+
+    @property
+    def has_target(self) -> bool:
+        return self.max_bytes is not None or self.min_psnr is not None
+
+    @property
+    def svg_cache(self) -> ContentCache | None:
+        """Where minified SVGs are recorded, next to the encoded images."""
+
+        if self.cache is None:
+            return None
+        return ContentCache(self.cache.root / "svg", suffix=".svg")
+
+    @property
+    def choices_path(self) -> Path | None:
+        """Where searched settings are recorded so later runs skip the search."""
+
+        if self.cache is None or not self.has_target:
+            return None
+        return self.cache.root / "choices.json"
+
+    def cache_key(self, source_path: Path) -> str:
+        params: list[object] = [WEBP_CACHE_VERSION, "webp", self.quality, WEBP_METHOD]
+        if self.has_target:
+            params += [self.max_bytes, self.min_psnr, self.max_attempts]
+        if self.max_dimension is not None:
+            params += ["max_dimension", self.max_dimension]
+        return hash_file(source_path, *params)
+
+
+@cache
+def _load_choices(path: Path) -> dict[str, int]:
     try:
-        md_text = index_md.read_text(encoding="utf-8")
-    except OSError as exc:
-        stats.errors.append(f"{index_md}: failed to read ({exc})")
-        log.error("failed to read file", path=str(index_md), error=str(exc))
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_choices(options: EncodeOptions, choices: dict[str, int]) -> None:
+    """Merge the settings chosen during this run into the choices file."""
+
+    path = options.choices_path
+    if path is None or not choices:
         return
+    merged = {**_load_choices(path), **choices}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}")
+    tmp_path.write_text(json.dumps(merged, sort_keys=True), encoding="utf-8")
+    os.replace(tmp_path, path)
+    _load_choices.cache_clear()
 
+
+@dataclass(frozen=True)
+class EncodeResult:
+    """Outcome of encoding one image; picklable so workers can return it.
+
+    `cache_hit` is None when no cache is configured.
+    """
+
+    seconds: float = 0.0
+    bytes_read: int = 0
+    bytes_written: int = 0
+    error: str | None = None
+    cache_hit: bool | None = None
+    # Set when the quality was searched for (not cached or recorded).
+    key: str | None = None
+    quality: int | None = None
+    attempts: int = 0
+    variants: int = 0
+    # False when the `.webp` already existed and only variants were written.
+    converted: bool = True
+    decoded_bytes: int = 0
+    # High-water resident set size of the encoding process over its whole
+    # life so far (every encode it ran, not just this one), in bytes.
+    worker_peak_rss: int | None = None
+
+
+def _worker_peak_rss() -> int | None:
     try:
-        front_matter = _parse_front_matter(md_text)
-    except FrontMatterError as exc:
-        stats.errors.append(f"{index_md}: front matter error ({exc})")
-        log.error("front matter parse error", path=str(index_md), error=str(exc))
-        return
+        import resource
+    except ImportError:
+        return None
+    # Kilobytes on Linux, bytes on macOS.
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
 
-    if front_matter is None:
-        log.info("no front matter found", path=str(index_md))
-        return
 
-    image_paths = _collect_image_paths(front_matter.data)
-    if not image_paths:
-        return
+def _encode_image(job: ImageJob, options: EncodeOptions) -> EncodeResult:
+    start = time.perf_counter()
+    try:
+        if job.target_path.exists():
+            return EncodeResult(
+                seconds=time.perf_counter() - start,
+                variants=_ensure_variants(job, options),
+                converted=False,
+            )
+        cache_hit = None
+        key = None
+        if options.cache is not None:
+            key = options.cache_key(job.source_path)
+            cache_hit = options.cache.fetch(key, job.target_path)
+        searched = None
+        attempts = 0
+        variants = 0
+        decoded_bytes = 0
+        if cache_hit:
+            if options.widths:
+                variants = _ensure_variants(job, options)
+        else:
+            choices_path = options.choices_path
+            recorded = None
+            if choices_path is not None and key is not None:
+                recorded = _load_choices(choices_path).get(key)
+            if recorded is not None:
+                conversion = _convert_to_webp(
+                    job.source_path,
+                    job.target_path,
+                    quality=recorded,
+                    options=options,
+                    search=False,
+                )
+            else:
+                conversion = _convert_to_webp(
+                    job.source_path,
+                    job.target_path,
+                    quality=options.quality,
+                    options=options,
+                )
+                if options.has_target:
+                    searched = conversion.quality
+            attempts = conversion.attempts
+            variants = conversion.variants
+            decoded_bytes = conversion.decoded_bytes
+            if options.cache is not None and key is not None:
+                options.cache.store(key, job.target_path)
+        return EncodeResult(
+            seconds=time.perf_counter() - start,
+            bytes_read=job.source_path.stat().st_size,
+            bytes_written=job.target_path.stat().st_size,
+            cache_hit=cache_hit,
+            key=key if searched is not None else None,
+            quality=searched,
+            attempts=attempts,
+            variants=variants,
+            decoded_bytes=decoded_bytes,
+            worker_peak_rss=_worker_peak_rss(),
+        )
+    except Exception as exc:
+        return EncodeResult(seconds=time.perf_counter() - start, error=str(exc))
 
-    replacements: dict[str, str] = {}
-    originals_to_delete: list[Path] = []
 
-    for image_path in image_paths:
+def _plan_bundle_images(
+    index_md: Path,
+    front_matter: FrontMatterBlock,
+    *,
+    repo_root: Path,
+    widths: tuple[int, ...],
+    log: structlog.stdlib.BoundLogger,
+    stats: ProcessingStats,
+) -> list[ImageJob]:
+    planned: list[ImageJob] = []
+    for image_path in _collect_image_paths(front_matter.data):
         suffix = Path(image_path).suffix.lower()
         if suffix == ".webp":
+            # Already converted; it only needs work when variants are wanted.
+            webp_path = _resolve_image_path(
+                image_path, index_md=index_md, repo_root=repo_root
+            )
+            if widths and webp_path.exists():
+                planned.append(
+                    ImageJob(
+                        image_path=image_path,
+                        source_path=webp_path,
+                        target_path=webp_path,
+                    )
+                )
             continue
         if suffix not in IMAGE_EXTENSIONS:
             continue
@@ -280,7 +678,8 @@ def _process_index_file(
         source_path = _resolve_image_path(
             image_path, index_md=index_md, repo_root=repo_root
         )
-        if not source_path.exists():
+        # Another page may already have converted (and removed) a shared image.
+        if not source_path.exists() and not source_path.with_suffix(".webp").exists():
             stats.errors.append(f"{index_md}: missing image file '{image_path}'")
             log.error(
                 "missing image file",
@@ -288,30 +687,299 @@ def _process_index_file(
                 image=str(image_path),
             )
             continue
+        if suffix == ".svg":
+            # Minified in place by `minify_svgs`; the reference stays as is.
+            continue
+
+        planned.append(
+            ImageJob(
+                image_path=image_path,
+                source_path=source_path,
+                target_path=source_path.with_suffix(".webp"),
+            )
+        )
+    return planned
+
+
+@dataclass(frozen=True)
+class PageCommit:
+    """A page whose front matter now points at `.webp` for every image.
+
+    `front_matter` is the rewritten block, or None when nothing needed
+    rewriting; `released` lists the originals the page no longer references.
+    """
 
-        target_path = source_path.with_suffix(".webp")
+    front_matter: FrontMatterBlock | None
+    released: tuple[Path, ...] = ()
+
+
+@dataclass
+class ImageGraph:
+    """Image references of every page, gathered before anything is encoded.
+
+    `jobs` holds one job per `.webp` target (the first page to reference it
+    owns the encode) and `references` maps each source image to the pages
+    that use it, so a shared original is only deleted once all of them have
+    been rewritten.
+    """
+
+    pages: list[tuple[Path, FrontMatterBlock, list[ImageJob]]] = field(
+        default_factory=list
+    )
+    jobs: dict[Path, ImageJob] = field(default_factory=dict)
+    references: dict[Path, list[Path]] = field(default_factory=dict)
+    # Every local image path named by some front matter, and its `.webp`.
+    referenced: set[Path] = field(default_factory=set)
+    # SVG file -> first page referencing it.
+    svgs: dict[Path, Path] = field(default_factory=dict)
+    bundle_dirs: list[Path] = field(default_factory=list)
+
+
+def build_image_graph(
+    bundles: Iterable[tuple[Path, FrontMatterBlock | None]],
+    *,
+    repo_root: Path,
+    widths: tuple[int, ...],
+    log: structlog.stdlib.BoundLogger,
+    stats: ProcessingStats,
+) -> ImageGraph:
+    graph = ImageGraph()
+    for index_md, front_matter in bundles:
+        graph.bundle_dirs.append(index_md.parent)
+        if front_matter is None:
+            log.info("no front matter found", path=str(index_md))
+            continue
+        for image_path in _collect_image_paths(front_matter.data):
+            path = _resolve_image_path(
+                image_path, index_md=index_md, repo_root=repo_root
+            )
+            graph.referenced.update((path, path.with_suffix(".webp")))
+            if path.suffix.lower() == ".svg" and path.exists():
+                graph.svgs.setdefault(path, index_md)
+        planned = _plan_bundle_images(
+            index_md,
+            front_matter,
+            repo_root=repo_root,
+            widths=widths,
+            log=log,
+            stats=stats,
+        )
+        for job in planned:
+            graph.jobs.setdefault(job.target_path, job)
+            pages = graph.references.setdefault(job.source_path, [])
+            if index_md not in pages:
+                pages.append(index_md)
+        if planned:
+            graph.pages.append((index_md, front_matter, planned))
+    return graph
+
+
+def minify_svgs(
+    svgs: dict[Path, Path],
+    *,
+    options: EncodeOptions,
+    log: structlog.stdlib.BoundLogger,
+    stats: ProcessingStats,
+) -> None:
+    """Minify each referenced SVG in place; front matter is not touched.
+
+    With a cache, the minified bytes are recorded under the hash of both the
+    original and the output. An SVG whose hash is its own recorded output is
+    already minified and left alone; one minified before is copied from the
+    cache.
+    """
+
+    metrics = stats.metrics
+    cache = options.svg_cache
+    for svg_path, index_md in svgs.items():
+        start = time.perf_counter()
         try:
-            converted = False
-            if not target_path.exists():
-                _convert_to_webp(source_path, target_path, quality=quality)
-                converted = True
-            replacements[image_path] = str(Path(image_path).with_suffix(".webp"))
-            originals_to_delete.append(source_path)
-            if converted:
-                stats.images_converted += 1
-        except Exception as exc:
-            stats.errors.append(f"{index_md}: failed to convert '{image_path}' ({exc})")
+            before = svg_path.stat().st_size
+            key = ""
+            if cache is not None:
+                key = hash_file(svg_path, SVG_MINIFY_VERSION)
+                entry = cache.lookup(key)
+                if entry is not None:
+                    metrics.count("svg_cache_hits")
+                    if hash_file(entry, SVG_MINIFY_VERSION) != key:
+                        cache.fetch(key, svg_path)
+                    continue
+            minified = minify_svg(svg_path.read_bytes())
+            if len(minified) < before:
+                svg_path.write_bytes(minified)
+            if cache is not None:
+                metrics.count("svg_cache_misses")
+                cache.store(key, svg_path)
+                output_key = hash_file(svg_path, SVG_MINIFY_VERSION)
+                if output_key != key:
+                    cache.store(output_key, svg_path)
+        except (OSError, SvgError) as exc:
+            stats.errors.append(f"{index_md}: failed to minify '{svg_path}' ({exc})")
             log.error(
-                "image conversion failed",
+                "svg minification failed",
                 path=str(index_md),
-                image=str(image_path),
+                image=str(svg_path),
                 error=str(exc),
             )
+            continue
+        finally:
+            metrics.add_time("svg_minify", time.perf_counter() - start)
+        after = min(len(minified), before)
+        if after == before:
+            continue
+        metrics.count("svgs_minified")
+        metrics.count("svg_bytes_saved", before - after)
+        log.info(
+            "minified svg",
+            image=str(svg_path),
+            bytes_before=before,
+            bytes_after=after,
+        )
+
+
+def find_orphan_images(graph: ImageGraph) -> list[Path]:
+    """Images inside the walked bundles that no front matter references.
+
+    Responsive variants (`<stem>-<width>w.webp`) count as referenced when
+    their `<stem>.webp` is.
+    """
+
+    orphans: list[Path] = []
+    for bundle_dir in graph.bundle_dirs:
+        for dirpath, dirnames, filenames in os.walk(bundle_dir):
+            dirnames[:] = sorted(name for name in dirnames if not name.startswith("."))
+            for name in sorted(filenames):
+                path = Path(dirpath) / name
+                if path.suffix.lower() not in IMAGE_EXTENSIONS:
+                    continue
+                if path in graph.referenced:
+                    continue
+                match = _VARIANT_NAME.fullmatch(name)
+                if match and path.with_name(f"{match[1]}.webp") in graph.referenced:
+                    continue
+                orphans.append(path)
+    return orphans
+
+
+def _variant_entry(
+    target_path: Path, widths: Iterable[int], *, content_root: Path
+) -> dict[str, Any] | None:
+    """Describe the variants on disk for one `.webp`, for the manifest.
+
+    Each `src` is relative to the bundle holding the image, whichever page
+    referenced it, as the shortcode looks it up in that bundle's resources.
+    """
+
+    pil = require("PIL.Image", package="Pillow", pip_name="pillow")
+    with pil.open(target_path) as image:
+        width, height = image.size
+    index_md = bundle_index_for(target_path, root=content_root)
+    bundle_dir = target_path.parent if index_md is None else index_md.parent
+    variants = [
+        {
+            "src": _variant_path(target_path, w).relative_to(bundle_dir).as_posix(),
+            "width": w,
+        }
+        for w in sorted(set(widths))
+        if w < width and _variant_path(target_path, w).exists()
+    ]
+    if not variants:
+        return None
+    return {"width": width, "height": height, "variants": variants}
+
+
+def _commit_bundle(
+    index_md: Path,
+    front_matter: FrontMatterBlock,
+    done: list[tuple[ImageJob, EncodeResult | None]],
+    *,
+    options: EncodeOptions,
+    content_root: Path,
+    log: structlog.stdlib.BoundLogger,
+    stats: ProcessingStats,
+) -> PageCommit | None:
+    """Rewrite `index_md` once every one of its images is encoded.
+
+    `done` pairs each planned image with the result of encoding it, or None
+    when the `.webp` already existed (or was encoded for another page). If any
+    encode failed the page is left untouched so it can be retried as a whole,
+    and None is returned. Originals are not deleted here: other pages may
+    still reference them, see `_delete_originals`.
+    """
+
+    metrics = stats.metrics
+    replacements: dict[str, str] = {}
+    released: list[Path] = []
+    failed = False
+    for job, result in done:
+        if result is not None and result.error is not None:
+            failed = True
+            stats.errors.append(
+                f"{index_md}: failed to convert '{job.image_path}' ({result.error})"
+            )
+            log.error(
+                "image conversion failed",
+                path=str(index_md),
+                image=str(job.image_path),
+                error=result.error,
+            )
+            continue
+        if result is not None and result.variants:
+            metrics.count("variants_written", result.variants)
+        if result is not None and not result.converted:
+            metrics.add_time("variants", result.seconds)
+        elif result is not None and result.cache_hit:
+            metrics.add_time("cache_fetch", result.seconds)
+            metrics.count("webp_cache_hits")
+            metrics.count("image_bytes_written", result.bytes_written)
+            stats.images_converted += 1
+        elif result is not None:
+            if result.cache_hit is False:
+                metrics.count("webp_cache_misses")
+            metrics.add_time("encode", result.seconds)
+            metrics.record_file("encode", job.source_path, result.seconds)
+            metrics.count("images_encoded")
+            metrics.count("image_bytes_read", result.bytes_read)
+            metrics.count("image_bytes_written", result.bytes_written)
+            stats.images_converted += 1
+            if result.key is not None and result.quality is not None:
+                stats.choices[result.key] = result.quality
+                metrics.count("quality_searches")
+                metrics.count("quality_attempts", result.attempts)
+        if job.source_path != job.target_path:
+            replacements[job.image_path] = str(
+                Path(job.image_path).with_suffix(".webp")
+            )
+            released.append(job.source_path)
 
+    if failed:
+        log.warning("front matter left unchanged", path=str(index_md))
+        return None
+    if options.widths:
+        for job, _ in done:
+            try:
+                stats.variants[job.target_path] = _variant_entry(
+                    job.target_path, options.widths, content_root=content_root
+                )
+            except OSError as exc:
+                log.warning(
+                    "failed to read variants",
+                    path=str(index_md),
+                    image=str(job.target_path),
+                    error=str(exc),
+                )
     if not replacements:
-        return
+        return PageCommit(front_matter=None)
+
+    try:
+        md_text = index_md.read_text(encoding="utf-8")
+    except OSError as exc:
+        stats.errors.append(f"{index_md}: failed to read ({exc})")
+        log.error("failed to read file", path=str(index_md), error=str(exc))
+        return None
+    metrics.count("index_bytes_read", len(md_text.encode()))
 
-    updated_text = _build_updated_text(front_matter, replacements)
+    updated_text = _build_updated_text(md_text, front_matter, replacements)
     if updated_text is None:
         stats.errors.append(
             f"{index_md}: failed to update front matter for replacements"
@@ -321,28 +989,511 @@ def _process_index_file(
             path=str(index_md),
             replacements=replacements,
         )
-        return
+        return None
 
     try:
-        index_md.write_text(updated_text, encoding="utf-8")
+        with metrics.phase("rewrite"):
+            index_md.write_text(updated_text, encoding="utf-8")
     except OSError as exc:
         stats.errors.append(f"{index_md}: failed to write ({exc})")
         log.error("failed to write file", path=str(index_md), error=str(exc))
-        return
+        return None
+    metrics.count("index_bytes_written", len(updated_text.encode()))
+
+    updated_block = _replace_paths(front_matter.block_text, replacements)
+    return PageCommit(
+        front_matter=FrontMatterBlock(
+            data=parse_front_matter_text(updated_block),
+            end_line=front_matter.end_line,
+            block_text=updated_block,
+        ),
+        released=tuple(released),
+    )
 
-    for original in originals_to_delete:
+
+def _outside_references(
+    graph: ImageGraph,
+    candidates: Iterable[Path],
+    *,
+    reference_root: Path,
+    repo_root: Path,
+    log: structlog.stdlib.BoundLogger,
+) -> dict[Path, list[Path]]:
+    """Pages under `reference_root`, outside `graph`, naming any of `candidates`.
+
+    Front matter may name an image relative to its own bundle, so one `git
+    grep` for the file names finds the pages that might, and their parsed
+    front matter decides. A page that cannot be read counts as referencing
+    every candidate.
+    """
+
+    wanted = {path.resolve(): path for path in candidates}
+    selected = {bundle_dir.resolve() for bundle_dir in graph.bundle_dirs}
+    found: dict[Path, list[Path]] = {}
+    for index_md in files_mentioning(
+        sorted({path.name for path in wanted.values()}),
+        cwd=reference_root,
+        pathspec=[f":(glob)**/{INDEX_NAME}"],
+    ):
+        if index_md.parent.resolve() in selected:
+            continue
         try:
-            original.unlink()
+            front_matter = parse_front_matter(index_md)
+        except (OSError, FrontMatterError) as exc:
+            log.warning("failed to read page", path=str(index_md), error=str(exc))
+            for path in wanted.values():
+                found.setdefault(path, []).append(index_md)
+            continue
+        if front_matter is None:
+            continue
+        for image_path in _collect_image_paths(front_matter.data):
+            path = _resolve_image_path(
+                image_path, index_md=index_md, repo_root=repo_root
+            ).resolve()
+            if path in wanted:
+                found.setdefault(wanted[path], []).append(index_md)
+    return found
+
+
+def _delete_originals(
+    graph: ImageGraph,
+    released: dict[Path, set[Path]],
+    *,
+    repo_root: Path,
+    reference_root: Path | None,
+    log: structlog.stdlib.BoundLogger,
+    stats: ProcessingStats,
+) -> None:
+    """Delete each original once every page referencing it was rewritten.
+
+    When `graph` only covers some of the bundles, pages elsewhere under
+    `reference_root` are checked too (see `_outside_references`).
+    """
+
+    remaining: dict[Path, list[Path]] = {}
+    for source_path, pages in graph.references.items():
+        rewritten = released.get(source_path)
+        if rewritten:
+            remaining[source_path] = [page for page in pages if page not in rewritten]
+    if reference_root is not None:
+        candidates = [path for path, pages in remaining.items() if not pages]
+        try:
+            outside = _outside_references(
+                graph,
+                candidates,
+                reference_root=reference_root,
+                repo_root=repo_root,
+                log=log,
+            )
+        except RuntimeError as exc:
+            # Without knowing who else uses them, keep every original.
+            log.warning("git grep failed, originals kept", error=str(exc))
+            outside = {path: [reference_root] for path in candidates}
+        for path, pages in outside.items():
+            remaining[path] += pages
+
+    for source_path, kept in remaining.items():
+        pages = graph.references[source_path]
+        if kept:
+            log.warning(
+                "original image kept",
+                image=str(source_path),
+                referenced_by=[str(page) for page in kept],
+            )
+            continue
+        try:
+            source_path.unlink(missing_ok=True)
         except OSError as exc:
-            stats.errors.append(f"{index_md}: failed to delete '{original}' ({exc})")
+            stats.errors.append(f"{pages[0]}: failed to delete '{source_path}' ({exc})")
             log.error(
                 "failed to delete original image",
-                path=str(index_md),
-                image=str(original),
+                path=str(pages[0]),
+                image=str(source_path),
                 error=str(exc),
             )
 
 
+def _read_bundles(
+    index_files: Iterable[Path],
+    *,
+    log: structlog.stdlib.BoundLogger,
+    stats: ProcessingStats,
+) -> Iterator[tuple[Path, FrontMatterBlock | None]]:
+    metrics = stats.metrics
+    for index_md in index_files:
+        stats.files_processed += 1
+        try:
+            with metrics.phase("front_matter"):
+                front_matter = parse_front_matter(index_md)
+        except OSError as exc:
+            stats.errors.append(f"{index_md}: failed to read ({exc})")
+            log.error("failed to read file", path=str(index_md), error=str(exc))
+            continue
+        except FrontMatterError as exc:
+            stats.errors.append(f"{index_md}: front matter error ({exc})")
+            log.error("front matter parse error", path=str(index_md), error=str(exc))
+            continue
+        yield index_md, front_matter
+
+
+@dataclass
+class _EncodeScheduler:
+    """Hands encodes to `pool` in order, within a decode memory budget.
+
+    A queued job starts once the estimates (see `estimate_decode_bytes`) of
+    the encodes in flight plus its own fit in `budget` bytes; when nothing
+    is in flight it starts regardless, so an image larger than the whole
+    budget is still converted, just alone. Without a pool, jobs are encoded
+    inline when their result is asked for.
+    """
+
+    options: EncodeOptions
+    budget: int
+    pool: Executor | None = None
+    queue: deque[ImageJob] = field(default_factory=deque)
+    estimates: dict[Path, int] = field(default_factory=dict)
+    futures: dict[Path, Future[EncodeResult]] = field(default_factory=dict)
+    running: dict[Future[EncodeResult], int] = field(default_factory=dict)
+    in_flight: int = 0
+    # Jobs that had to wait for memory before starting.
+    deferred: set[Path] = field(default_factory=set)
+
+    def _estimate(self, job: ImageJob) -> int:
+        estimate = self.estimates.get(job.target_path)
+        if estimate is None:
+            estimate = estimate_decode_bytes(job.source_path, self.options)
+            self.estimates[job.target_path] = estimate
+        return estimate
+
+    def _admit(self) -> None:
+        if self.pool is None:
+            return
+        for future in [future for future in self.running if future.done()]:
+            self.in_flight -= self.running.pop(future)
+        while self.queue:
+            estimate = self._estimate(self.queue[0])
+            if self.running and self.in_flight + estimate > self.budget:
+                self.deferred.add(self.queue[0].target_path)
+                return
+            job = self.queue.popleft()
+            future = self.pool.submit(_encode_image, job, self.options)
+            self.futures[job.target_path] = future
+            self.running[future] = estimate
+            self.in_flight += estimate
+
+    def result(self, job: ImageJob) -> EncodeResult:
+        if self.pool is None:
+            self._estimate(job)
+            return _encode_image(job, self.options)
+        from concurrent.futures import FIRST_COMPLETED, wait
+
+        while True:
+            self._admit()
+            future = self.futures.get(job.target_path)
+            if future is not None and future.done():
+                return future.result()
+            # Keep admitting queued work as memory frees up, not only once
+            # this job is done.
+            wait(self.running, return_when=FIRST_COMPLETED)
+
+
+def _record_footprint(
+    job: ImageJob,
+    result: EncodeResult,
+    *,
+    estimate: int,
+    budget: int,
+    inline: bool,
+    log: structlog.stdlib.BoundLogger,
+    metrics: Metrics,
+) -> None:
+    """Log the decode memory of one encode against its estimate.
+
+    The peak RSS is the worker's, not the encode's. When encoding `inline` it
+    is the peak of this whole run, so the line is only logged at debug level.
+    """
+
+    if estimate > budget:
+        log.warning(
+            "image exceeds memory budget, encoded alone",
+            image=str(job.source_path),
+            estimated_mb=round(estimate / MB, 1),
+            budget_mb=round(budget / MB, 1),
+        )
+    if not result.decoded_bytes:
+        return
+    metrics.count("decode_bytes_estimated", estimate)
+    metrics.count("decode_bytes", result.decoded_bytes)
+    peak_rss = result.worker_peak_rss
+    emit = log.debug if inline else log.info
+    emit(
+        "image memory",
+        image=str(job.source_path),
+        estimated_mb=round(estimate / MB, 1),
+        decoded_mb=round(result.decoded_bytes / MB, 1),
+        worker_peak_rss_mb=None if peak_rss is None else round(peak_rss / MB, 1),
+    )
+
+
+def convert_bundles(
+    bundles: Iterable[tuple[Path, FrontMatterBlock | None]],
+    *,
+    repo_root: Path,
+    options: EncodeOptions,
+    jobs: int,
+    log: structlog.stdlib.BoundLogger,
+    stats: ProcessingStats,
+    memory_budget_mb: int = MEMORY_BUDGET_MB,
+    reference_root: Path | None = None,
+) -> dict[Path, FrontMatterBlock]:
+    """Convert the images of every bundle, encoding in `jobs` worker processes.
+
+    All front matter is planned first, so every source image is encoded
+    exactly once however many pages reference it. Workers only take on
+    images while their estimated decode memory fits `memory_budget_mb`. Each page is committed
+    (front matter rewritten) once all of its own encodes are done, in input
+    order; originals are deleted at the end, once no page still references
+    them. When `bundles` is only a selection, pass the `reference_root` the
+    other pages live under so their references are honoured too. Returns the
+    rewritten front matter by `index.md` path.
+    """
+
+    metrics = stats.metrics
+    with metrics.phase("plan"):
+        graph = build_image_graph(
+            bundles,
+            repo_root=repo_root,
+            widths=options.widths,
+            log=log,
+            stats=stats,
+        )
+    minify_svgs(graph.svgs, options=options, log=log, stats=stats)
+    metrics.count("unique_images", len(graph.jobs))
+    metrics.count("shared_images", sum(len(p) > 1 for p in graph.references.values()))
+    orphans = find_orphan_images(graph)
+    metrics.count("orphan_images", len(orphans))
+    for orphan in orphans:
+        log.warning("unreferenced image", image=str(orphan))
+
+    pending = [
+        job
+        for job in graph.jobs.values()
+        if options.widths or not job.target_path.exists()
+    ]
+    metrics.count("images_submitted", len(pending))
+    budget = memory_budget_mb * MB
+    updated: dict[Path, FrontMatterBlock] = {}
+    released: dict[Path, set[Path]] = {}
+    with contextlib.ExitStack() as stack:
+        scheduler = _EncodeScheduler(options=options, budget=budget)
+        if jobs > 1 and len(pending) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            scheduler.pool = stack.enter_context(ProcessPoolExecutor(max_workers=jobs))
+            scheduler.queue.extend(pending)
+        pending_targets = {job.target_path for job in pending}
+        results: dict[Path, EncodeResult] = {}
+
+        for index_md, front_matter, planned in graph.pages:
+            start = time.perf_counter()
+            done: list[tuple[ImageJob, EncodeResult | None]] = []
+            for job in planned:
+                target = job.target_path
+                if target not in pending_targets:
+                    done.append((job, None))
+                    continue
+                if graph.jobs[target] is job:
+                    results[target] = result = scheduler.result(job)
+                    _record_footprint(
+                        job,
+                        result,
+                        estimate=scheduler.estimates.get(target, 0),
+                        budget=budget,
+                        inline=scheduler.pool is None,
+                        log=log,
+                        metrics=metrics,
+                    )
+                    done.append((job, result))
+                    continue
+                # Encoded for an earlier page; only its failure matters here.
+                result = results[target]
+                done.append((job, result if result.error is not None else None))
+            commit = _commit_bundle(
+                index_md,
+                front_matter,
+                done,
+                options=options,
+                content_root=repo_root / "content",
+                log=log,
+                stats=stats,
+            )
+            metrics.record_file("index_file", index_md, time.perf_counter() - start)
+            if commit is None:
+                continue
+            if commit.front_matter is not None:
+                updated[index_md] = commit.front_matter
+            for source_path in commit.released:
+                released.setdefault(source_path, set()).add(index_md)
+
+    metrics.count("memory_deferred", len(scheduler.deferred))
+    _delete_originals(
+        graph,
+        released,
+        repo_root=repo_root,
+        reference_root=reference_root,
+        log=log,
+        stats=stats,
+    )
+    return updated
+
+
+def write_variant_manifest(
+    path: Path,
+    entries: dict[Path, dict[str, Any] | None],
+    *,
+    content_root: Path,
+    log: structlog.stdlib.BoundLogger,
+) -> bool:
+    """Merge `entries` into the manifest Hugo reads to build `srcset`.
+
+    Keys are `.webp` paths relative to `content_root`, i.e. the directory of
+    the bundle holding the image joined with its `src` there. Images outside
+    `content_root` (e.g. under static/) are skipped, since the shortcode only
+    looks up page resources. Entries whose image is gone are dropped. Returns
+    True when the file changed.
+    """
+
+    content_root = content_root.resolve()
+    try:
+        existing = json.loads(path.read_text(encoding="utf-8")).get("images", {})
+    except (OSError, ValueError, AttributeError):
+        existing = {}
+    images: dict[str, Any] = {
+        key: value for key, value in existing.items() if (content_root / key).exists()
+    }
+    for target_path, entry in entries.items():
+        resolved = target_path.resolve()
+        if not resolved.is_relative_to(content_root):
+            log.info("image outside content, no variant entry", image=str(target_path))
+            continue
+        key = resolved.relative_to(content_root).as_posix()
+        if entry is None:
+            images.pop(key, None)
+        else:
+            images[key] = entry
+    text = (
+        json.dumps(
+            {"version": 1, "images": images},
+            indent=4,
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        + "\n"
+    )
+    try:
+        if path.read_text(encoding="utf-8") == text:
+            return False
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return True
+
+
+def _parse_widths(value: str) -> tuple[int, ...]:
+    try:
+        widths = tuple(sorted({int(part) for part in value.split(",") if part}))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid width list: {value!r}") from None
+    if not widths or widths[0] < 1:
+        raise argparse.ArgumentTypeError("widths must be positive integers")
+    return widths
+
+
+def trim_cache(
+    cache: ContentCache | None,
+    *,
+    max_mb: int,
+    log: structlog.stdlib.BoundLogger,
+    metrics: Metrics,
+) -> None:
+    if cache is None:
+        return
+    try:
+        with metrics.phase("cache_evict"):
+            removed, remaining = cache.evict(max_mb * MB)
+    except OSError as exc:
+        log.warning("failed to trim image cache", path=str(cache.root), error=str(exc))
+        return
+    metrics.count("webp_cache_evicted", removed)
+    log.info(
+        "image cache",
+        path=str(cache.root),
+        hits=metrics.counters.get("webp_cache_hits", 0),
+        misses=metrics.counters.get("webp_cache_misses", 0),
+        evicted=removed,
+        size_mb=round(remaining / MB, 1),
+    )
+
+
+def _index_files_for_paths(
+    paths: Iterable[Path],
+    *,
+    root: Path,
+    log: structlog.stdlib.BoundLogger,
+    stats: ProcessingStats,
+) -> list[Path]:
+    found: dict[Path, None] = {}
+    for path in paths:
+        index_md = bundle_index_for(path, root=root)
+        if index_md is None:
+            log.info("not in a page bundle, skipped", path=str(path))
+            continue
+        if not index_md.exists():
+            log.error("index.md file does not exist", path=str(index_md))
+            stats.errors.append(f"{index_md}: file does not exist")
+            continue
+        found[index_md] = None
+    return sorted(found)
+
+
+def changed_index_files(
+    ref: str,
+    *,
+    root: Path,
+    repo_root: Path,
+    log: structlog.stdlib.BoundLogger,
+    metrics: Metrics,
+) -> list[Path]:
+    """Bundles under `root` with a file changed since `ref`, sorted.
+
+    A change anywhere in a bundle (its `index.md` or any image in it) selects
+    that bundle. A changed image also selects the pages naming it by its
+    repository path (e.g. `/content/...`), found with one `git grep`.
+    """
+
+    root = root.resolve()
+    changed = changed_files(ref, cwd=root)
+    found: dict[Path, None] = {}
+    needles: list[str] = []
+    for path in changed:
+        if path.suffix.lower() in IMAGE_EXTENSIONS and path.is_relative_to(repo_root):
+            needles.append(path.relative_to(repo_root).as_posix())
+        if not path.is_relative_to(root):
+            continue
+        index_md = bundle_index_for(path, root=root)
+        if index_md is not None and index_md.is_file():
+            found[index_md] = None
+    for index_md in files_mentioning(
+        needles, cwd=root, pathspec=[f":(glob)**/{INDEX_NAME}"]
+    ):
+        found[index_md] = None
+    metrics.count("changed_files", len(changed))
+    metrics.count("changed_bundles", len(found))
+    log.info("changed bundles", ref=ref, files=len(changed), bundles=len(found))
+    return sorted(found)
+
+
 def _parse_args(argv: Sequence[str] | None) -> argparse.Namespace:
     repo_root = Path(__file__).resolve().parents[1]
     parser = argparse.ArgumentParser(
@@ -360,66 +1511,239 @@ def _parse_args(argv: Sequence[str] | None) -> argparse.Namespace:
         type=Path,
         help="Process a single index.md file.",
     )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        type=Path,
+        help="index.md files, or files inside page bundles, to process (as passed by pre-commit).",
+    )
+    parser.add_argument(
+        "--changed-since",
+        metavar="REF",
+        help="Only process bundles under --root whose files changed since the git REF.",
+    )
     parser.add_argument(
         "--quality",
         type=int,
         default=80,
         help="WebP quality setting (1-100).",
     )
-    return parser.parse_args(argv)
-
-
-def _validate_quality(quality: int) -> int:
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument(
+        "--max-bytes",
+        type=int,
+        help="Search each image for the highest quality (up to --quality) that fits in N bytes.",
+    )
+    target.add_argument(
+        "--min-psnr",
+        type=float,
+        help="Search each image for the lowest quality whose PSNR is at least N dB.",
+    )
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=7,
+        help="Encodes tried per image by --max-bytes/--min-psnr (default: 7).",
+    )
+    parser.add_argument(
+        "--max-frames",
+        type=int,
+        default=MAX_FRAMES,
+        help=f"Reject animations with more frames than this (default: {MAX_FRAMES}).",
+    )
+    parser.add_argument(
+        "--max-pixels",
+        type=int,
+        default=MAX_PIXELS,
+        help=f"Reject animations whose frames add up to more pixels (default: {MAX_PIXELS}).",
+    )
+    parser.add_argument(
+        "--max-dimension",
+        type=int,
+        help="Downscale images whose longer side exceeds N pixels while decoding.",
+    )
+    parser.add_argument(
+        "--memory-budget-mb",
+        type=int,
+        default=MEMORY_BUDGET_MB,
+        help=f"Estimated decode memory --jobs workers may use at once (default: {MEMORY_BUDGET_MB}).",
+    )
+    parser.add_argument(
+        "--widths",
+        type=_parse_widths,
+        default=(),
+        help="Also write responsive variants at these widths, e.g. 320,640,1280.",
+    )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        default=repo_root / "data" / "image_variants.json",
+        help="Where --widths records variants for the tool-image shortcode.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Encode images in N worker processes (0 = one per CPU).",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=repo_root / ".cache" / "webp",
+        help="Content-addressed cache of encoded images.",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=512,
+        help="Evict least recently used cache entries above this size (default: 512).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always encode; do not read or write the image cache.",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        type=Path,
+        help="Write phase timings and counters (.json, else OpenMetrics text).",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        help="Dump cProfile stats for the conversion run to this file.",
+    )
+    args = parser.parse_args(argv)
+    if sum(map(bool, (args.paths, args.file, args.changed_since))) > 1:
+        parser.error("paths, --file and --changed-since cannot be combined")
+    if args.jobs < 0:
+        parser.error("--jobs must be 0 or a positive integer")
+    if args.jobs == 0:
+        args.jobs = os.cpu_count() or 1
+    if args.max_attempts < 1:
+        parser.error("--max-attempts must be a positive integer")
+    if args.max_frames < 1 or args.max_pixels < 1:
+        parser.error("--max-frames and --max-pixels must be positive integers")
+    if args.max_dimension is not None and args.max_dimension < 1:
+        parser.error("--max-dimension must be a positive integer")
+    if args.memory_budget_mb < 1:
+        parser.error("--memory-budget-mb must be a positive integer")
+    return args
+
+
+def validate_quality(quality: int) -> int:
     if quality < 1 or quality > 100:
         raise ValueError("Quality must be between 1 and 100.")
     return quality
 
 
 def main(argv: Sequence[str] | None = None) -> int:
-    log = _configure_logging()
+    args = _parse_args(argv)
+    log = configure_logging("ci.convert_page_images")
     repo_root = Path(__file__).resolve().parents[1]
 
     try:
-        args = _parse_args(argv)
-        quality = _validate_quality(args.quality)
+        quality = validate_quality(args.quality)
     except Exception as exc:
         log.error("invalid arguments", error=str(exc))
         return 2
 
     stats = ProcessingStats()
+    metrics = stats.metrics
+    options = EncodeOptions(
+        quality=quality,
+        cache=None if args.no_cache else ContentCache(args.cache_dir, suffix=".webp"),
+        max_bytes=args.max_bytes,
+        min_psnr=args.min_psnr,
+        max_attempts=args.max_attempts,
+        widths=args.widths,
+        max_frames=args.max_frames,
+        max_pixels=args.max_pixels,
+        max_dimension=args.max_dimension,
+    )
 
-    if args.file:
-        index_md = args.file
-        if not index_md.exists():
-            log.error("index.md file does not exist", path=str(index_md))
-            stats.errors.append(f"{index_md}: file does not exist")
-        else:
-            _process_index_file(
-                index_md,
-                repo_root=repo_root,
-                quality=quality,
-                log=log,
-                stats=stats,
+    def process(index_files: Iterable[Path], *, subset: bool = True) -> None:
+        convert_bundles(
+            _read_bundles(index_files, log=log, stats=stats),
+            repo_root=repo_root,
+            options=options,
+            jobs=args.jobs,
+            log=log,
+            stats=stats,
+            memory_budget_mb=args.memory_budget_mb,
+            reference_root=args.root if subset else None,
+        )
+
+    with profile_to(args.profile):
+        if args.file:
+            index_md = args.file
+            if not index_md.exists():
+                log.error("index.md file does not exist", path=str(index_md))
+                stats.errors.append(f"{index_md}: file does not exist")
+            else:
+                process([index_md])
+        elif args.paths:
+            process(
+                _index_files_for_paths(args.paths, root=args.root, log=log, stats=stats)
             )
-    else:
-        root = args.root
-        if not root.exists():
-            log.error("root directory does not exist", path=str(root))
-            stats.errors.append(f"{root}: root directory does not exist")
+        elif args.changed_since:
+            try:
+                with metrics.phase("changed_files"):
+                    index_files = changed_index_files(
+                        args.changed_since,
+                        root=args.root,
+                        repo_root=repo_root,
+                        log=log,
+                        metrics=metrics,
+                    )
+            except RuntimeError as exc:
+                log.error("git diff failed", ref=args.changed_since, error=str(exc))
+                stats.errors.append(f"{args.changed_since}: git diff failed ({exc})")
+            else:
+                process(index_files)
         else:
-            for index_md in _iter_index_files(root):
-                _process_index_file(
-                    index_md,
-                    repo_root=repo_root,
-                    quality=quality,
-                    log=log,
-                    stats=stats,
+            root = args.root
+            if not root.exists():
+                log.error("root directory does not exist", path=str(root))
+                stats.errors.append(f"{root}: root directory does not exist")
+            else:
+                process(
+                    metrics.timed_iter("walk", _iter_index_files(root)), subset=False
                 )
 
+    try:
+        save_choices(options, stats.choices)
+    except OSError as exc:
+        log.warning("failed to record quality choices", error=str(exc))
+    trim_cache(options.cache, max_mb=args.cache_max_mb, log=log, metrics=metrics)
+    if options.widths:
+        try:
+            if write_variant_manifest(
+                args.manifest,
+                stats.variants,
+                content_root=repo_root / "content",
+                log=log,
+            ):
+                log.info("wrote variant manifest", path=str(args.manifest))
+        except (OSError, ValueError) as exc:
+            stats.errors.append(f"{args.manifest}: failed to write ({exc})")
+            log.error(
+                "failed to write variant manifest",
+                path=str(args.manifest),
+                error=str(exc),
+            )
+    metrics.count("files_processed", stats.files_processed)
+    metrics.count("errors", len(stats.errors))
+    metrics.emit(log)
+    if args.metrics_out:
+        metrics.write(args.metrics_out)
+        log.info("wrote metrics", path=str(args.metrics_out))
+
     log.info(
         "conversion complete",
         files_processed=stats.files_processed,
         images_converted=stats.images_converted,
+        svg_bytes_saved=metrics.counters.get("svg_bytes_saved", 0),
         errors=len(stats.errors),
     )
 
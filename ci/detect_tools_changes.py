@@ -2,22 +2,51 @@
 # /// script
 # requires-python = ">=3.14"
 # dependencies = [
+#   "structlog>=24.0.0",
 #   "PyYAML>=6.0.0",
 # ]
 # ///
-"""Detect added, updated, or removed tool entries in data/tools.yaml."""
+"""Detect added, updated, or removed tool entries in data/tools.yaml.
+
+`ci/build_tools_data.py` writes a `fingerprint` into every entry and a
+`digest` over all of them into the header. When both versions carry them,
+identical digests end the comparison, added/removed/updated are decided from
+the fingerprints alone, and only entries whose fingerprints differ are parsed
+(to confirm the change). Files without them are fully parsed and compared.
+
+By default HEAD is compared with the working tree; `--base`/`--head` compare
+any two refs (e.g. the range of a push). Both sides are read through one
+`git cat-file --batch` process.
+
+Usage:
+    uv run ci/detect_tools_changes.py
+    uv run ci/detect_tools_changes.py --base origin/main --head HEAD --json
+"""
 
 from __future__ import annotations
 
 import argparse
-import subprocess
+import hashlib
+import json
+import os
+import sys
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Sequence
+
+from common.deps import require
+from common.git import GitObjectReader
+from common.log import configure_logging
+from common.metrics import Metrics, profile_to
 
-import yaml
+FINGERPRINT_KEY = "fingerprint"
 
+_ENTRY_PREFIX = "  - "
+_FINGERPRINT_PREFIX = f"      {FINGERPRINT_KEY}: "
+_DIGEST_PREFIX = "digest: "
 
-def parse_args() -> argparse.Namespace:
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Summarize changes in data/tools.yaml")
     parser.add_argument(
         "path",
@@ -26,21 +55,146 @@ def parse_args() -> argparse.Namespace:
         default=Path("data/tools.yaml"),
         help="Path to tools.yaml (default: data/tools.yaml)",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--base",
+        metavar="REF",
+        help="Compare from this git ref (default: HEAD)",
+    )
+    parser.add_argument(
+        "--head",
+        metavar="REF",
+        help="Compare to this git ref (default: the working tree)",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the changes as a JSON object instead of the summary string",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        type=Path,
+        help="Write phase timings and counters (.json, else OpenMetrics text)",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        help="Dump cProfile stats to this file",
+    )
+    return parser.parse_args(argv)
+
+
+def read_version(reader: GitObjectReader, ref: str, path: Path) -> str:
+    """`path` (relative to the current directory) as of `ref`; "" if absent there."""
+
+    data = reader.read_blob(ref, "./" + Path(os.path.relpath(path)).as_posix())
+    return data.decode("utf-8") if data is not None else ""
+
+
+def entry_fingerprint(slug: str, lines: Sequence[str]) -> str:
+    """Fingerprint of one rendered entry (its field lines, without the slug line)."""
 
+    digest = hashlib.sha256(slug.encode())
+    for line in lines:
+        digest.update(b"\n")
+        digest.update(line.encode())
+    return digest.hexdigest()[:16]
 
-def read_head_version(path: Path) -> str:
-    try:
-        return subprocess.check_output(
-            ["git", "show", f"HEAD:{path.as_posix()}"], text=True
+
+def _unquote(value: str) -> str:
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1]
+    return value
+
+
+@dataclass
+class IndexedTools:
+    """The fingerprints of a rendered tools.yaml, found without parsing YAML.
+
+    `entries` maps a slug to its fingerprint and the span of its block in
+    `text`, so a single entry can be parsed on its own.
+    """
+
+    text: str
+    digest: str
+    entries: Dict[str, tuple[str, int, int]] = field(default_factory=dict)
+
+    def load_entry(self, slug: str) -> Any:
+        _, start, end = self.entries[slug]
+        return _strip_fingerprint(
+            load_yaml_entries("tools:\n" + self.text[start:end]).get(slug)
         )
-    except subprocess.CalledProcessError:
-        return ""
+
+
+def read_digest(content: str) -> str | None:
+    """The `digest` from the header of a tools.yaml, without reading the entries."""
+
+    start = 0
+    while start < len(content):
+        end = content.find("\n", start)
+        end = len(content) if end < 0 else end
+        line = content[start:end]
+        if line.startswith(_DIGEST_PREFIX):
+            return _unquote(line[len(_DIGEST_PREFIX) :])
+        if line.startswith("tools:"):
+            break
+        start = end + 1
+    return None
+
+
+def index_tools_yaml(content: str) -> IndexedTools | None:
+    """Scan a tools.yaml written by `ci/build_tools_data.py` line by line.
+
+    Returns `None` when the file has no `digest` header or an entry has no
+    fingerprint (e.g. an older or hand-written file); parse it fully instead.
+    """
+
+    if not content.strip():
+        return IndexedTools(text=content, digest="")
+    index: IndexedTools | None = None
+    slug: str | None = None
+    fingerprint: str | None = None
+    start = offset = 0
+    for line in content.splitlines(keepends=True):
+        if index is None:
+            if line.startswith(_DIGEST_PREFIX):
+                index = IndexedTools(
+                    text=content, digest=_unquote(line[len(_DIGEST_PREFIX) :])
+                )
+            elif line.startswith("tools:"):
+                return None
+        elif line.startswith(_ENTRY_PREFIX):
+            if slug is not None:
+                if fingerprint is None:
+                    return None
+                index.entries[slug] = (fingerprint, start, offset)
+            slug = line[len(_ENTRY_PREFIX) :].rstrip().removesuffix(":")
+            start = offset
+            fingerprint = None
+        elif slug is not None and fingerprint is None:
+            if not line.startswith(_FINGERPRINT_PREFIX):
+                return None
+            fingerprint = _unquote(line[len(_FINGERPRINT_PREFIX) :])
+        offset += len(line)
+    if index is None:
+        return None
+    if slug is not None:
+        if fingerprint is None:
+            return None
+        index.entries[slug] = (fingerprint, start, offset)
+    return index
+
+
+def _strip_fingerprint(data: Any) -> Any:
+    if isinstance(data, dict) and FINGERPRINT_KEY in data:
+        return {key: value for key, value in data.items() if key != FINGERPRINT_KEY}
+    return data
 
 
 def load_yaml_entries(content: str) -> Dict[str, Any]:
     if not content.strip():
         return {}
+    yaml = require("yaml", package="PyYAML", pip_name="pyyaml")
     loaded = yaml.safe_load(content) or {}
     tools = loaded.get("tools", []) if isinstance(loaded, dict) else []
     entries: Dict[str, Any] = {}
@@ -48,46 +202,146 @@ def load_yaml_entries(content: str) -> Dict[str, Any]:
         if not isinstance(entry, dict):
             continue
         for slug, data in entry.items():
-            entries[str(slug)] = data
+            # Derived from the other fields; comparing it would only matter
+            # between files with and without fingerprints.
+            entries[str(slug)] = _strip_fingerprint(data)
     return entries
 
 
-def summarize_changes(
+@dataclass
+class ToolChanges:
+    added: List[str] = field(default_factory=list)
+    updated: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "added": self.added,
+            "updated": self.updated,
+            "removed": self.removed,
+            "summary": self.summary(),
+        }
+
+    def summary(self) -> str:
+        parts: List[str] = []
+        if self.added:
+            parts.append("added " + ", ".join(self.added))
+        if self.updated:
+            parts.append("updated " + ", ".join(self.updated))
+        if self.removed:
+            parts.append("removed " + ", ".join(self.removed))
+        return "; ".join(parts)
+
+
+def diff_entries(
     head_entries: Dict[str, Any], worktree_entries: Dict[str, Any]
-) -> str:
+) -> ToolChanges:
     head_slugs = set(head_entries)
     worktree_slugs = set(worktree_entries)
+    return ToolChanges(
+        added=sorted(worktree_slugs - head_slugs),
+        updated=[
+            slug
+            for slug in sorted(head_slugs & worktree_slugs)
+            if head_entries[slug] != worktree_entries[slug]
+        ],
+        removed=sorted(head_slugs - worktree_slugs),
+    )
+
+
+def summarize_changes(
+    head_entries: Dict[str, Any], worktree_entries: Dict[str, Any]
+) -> str:
+    return diff_entries(head_entries, worktree_entries).summary()
 
-    added = sorted(worktree_slugs - head_slugs)
-    removed = sorted(head_slugs - worktree_slugs)
-    updated: List[str] = []
-    for slug in sorted(head_slugs & worktree_slugs):
-        if head_entries[slug] != worktree_entries[slug]:
-            updated.append(slug)
 
-    parts: List[str] = []
-    if added:
-        parts.append("added " + ", ".join(added))
-    if updated:
-        parts.append("updated " + ", ".join(updated))
-    if removed:
-        parts.append("removed " + ", ".join(removed))
-    return "; ".join(parts)
+def compare_tools_yaml(
+    head_content: str, worktree_content: str, *, metrics: Metrics | None = None
+) -> ToolChanges:
+    """Changes from `head_content` to `worktree_content`, by fingerprint if possible."""
 
+    metrics = metrics or Metrics("detect_tools_changes")
+    if head_content == worktree_content:
+        return ToolChanges()
+    digest = read_digest(head_content)
+    if digest is not None and digest == read_digest(worktree_content):
+        return ToolChanges()
+    head = index_tools_yaml(head_content)
+    worktree = index_tools_yaml(worktree_content)
+    if head is None or worktree is None:
+        metrics.count("full_parses")
+        return diff_entries(
+            load_yaml_entries(head_content), load_yaml_entries(worktree_content)
+        )
 
-def main() -> int:
-    args = parse_args()
+    head_slugs = head.entries.keys()
+    worktree_slugs = worktree.entries.keys()
+    changes = ToolChanges(
+        added=sorted(worktree_slugs - head_slugs),
+        removed=sorted(head_slugs - worktree_slugs),
+    )
+    for slug in sorted(head_slugs & worktree_slugs):
+        if head.entries[slug][0] == worktree.entries[slug][0]:
+            continue
+        # A fingerprint can also change with the rendering, not the data.
+        metrics.count("entries_parsed", 2)
+        if head.load_entry(slug) != worktree.load_entry(slug):
+            changes.updated.append(slug)
+    return changes
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = parse_args(argv)
     target = args.path
+    metrics = Metrics("detect_tools_changes")
 
-    head_content = read_head_version(target)
-    worktree_content = target.read_text(encoding="utf-8") if target.exists() else ""
+    with profile_to(args.profile), GitObjectReader(Path.cwd()) as reader:
+        with metrics.phase("read_refs"):
+            try:
+                base = reader.resolve_commit(args.base or "HEAD")
+                head = reader.resolve_commit(args.head) if args.head else None
+            except RuntimeError:
+                # Not a git repository.
+                base = head = None
+            for name, ref, commit in (
+                ("base", args.base, base),
+                ("head", args.head, head),
+            ):
+                if ref and commit is None:
+                    print(f"unknown --{name} ref: {ref}", file=sys.stderr)
+                    return 2
+            # Without a commit to read (outside git or before the first
+            # commit) everything in the working tree counts as added.
+            base_content = read_version(reader, base, target) if base else ""
+            if head is not None:
+                head_content = read_version(reader, head, target)
+        if head is None:
+            with metrics.phase("read_worktree"):
+                head_content = (
+                    target.read_text(encoding="utf-8") if target.exists() else ""
+                )
+        metrics.count("git_subprocesses", reader.subprocess_count)
+        metrics.count("bytes_read", len(base_content.encode()))
+        metrics.count("bytes_read", len(head_content.encode()))
 
-    head_entries = load_yaml_entries(head_content)
-    worktree_entries = load_yaml_entries(worktree_content)
+        with metrics.phase("compare"):
+            changes = compare_tools_yaml(base_content, head_content, metrics=metrics)
+    if args.json:
+        print(
+            json.dumps(
+                {"base": base, "head": head, **changes.as_dict()}, sort_keys=True
+            )
+        )
+    elif changes.summary():
+        print(changes.summary())
 
-    summary = summarize_changes(head_entries, worktree_entries)
-    if summary:
-        print(summary)
+    if args.metrics_out or args.profile:
+        # stdout carries the change summary, so logs go to stderr (the default).
+        log = configure_logging("ci.detect_tools_changes")
+        metrics.emit(log)
+        if args.metrics_out:
+            metrics.write(args.metrics_out)
+            log.info("wrote metrics", path=str(args.metrics_out))
     return 0
 
 
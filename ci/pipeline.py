@@ -0,0 +1,314 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.14"
+# dependencies = [
+#   "structlog>=24.0.0",
+#   "PyYAML>=6.0.0",
+#   "Pillow>=10.3.0",
+# ]
+# ///
+"""Run the content pipeline in one process.
+
+Walks `content/` once, reads and parses each bundle's front matter once, then
+feeds that model to each stage in turn:
+
+1. image conversion (as `ci/convert_page_images.py`), which updates the model
+   for every bundle it rewrites;
+2. tools data (as `ci/build_tools_data.py`), reusing the parsed front matter of
+   the bundles under `content/tools`;
+3. change detection: the added/updated/removed summary is printed on stdout,
+   the same string `ci/build_tools_data.py` prints.
+
+Usage:
+    uv run ci/pipeline.py
+    uv run ci/pipeline.py --skip-images --jobs 0
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Sequence
+
+if TYPE_CHECKING:
+    import structlog
+
+from build_tools_data import ToolEntrySource, build_and_write
+from common.cas import ContentCache
+from common.front_matter import FrontMatterError
+from common.git import GitHistoryIndex, build_git_history_index
+from common.log import configure_logging
+from common.metrics import Metrics, profile_to
+from common.walk import iter_bundle_index_files
+from convert_page_images import (
+    MEMORY_BUDGET_MB,
+    EncodeOptions,
+    FrontMatterBlock,
+    ProcessingStats,
+    convert_bundles,
+    parse_front_matter,
+    trim_cache,
+    validate_quality,
+)
+
+
+@dataclass
+class Bundle:
+    """One page bundle as read by the walk, shared by every stage.
+
+    `error` holds the exception raised while reading the front matter; the
+    image stage reports it and the tools stage re-raises it, like the
+    standalone scripts do.
+    """
+
+    index_md: Path
+    front_matter: FrontMatterBlock | None = None
+    error: Exception | None = None
+
+
+def load_bundles(content_root: Path, *, metrics: Metrics) -> list[Bundle]:
+    bundles: list[Bundle] = []
+    for index_md in metrics.timed_iter("walk", iter_bundle_index_files(content_root)):
+        bundle = Bundle(index_md=index_md)
+        start = time.perf_counter()
+        try:
+            bundle.front_matter = parse_front_matter(index_md)
+        except (OSError, FrontMatterError) as exc:
+            bundle.error = exc
+        elapsed = time.perf_counter() - start
+        metrics.add_time("front_matter", elapsed)
+        metrics.record_file("front_matter", index_md, elapsed)
+        metrics.count("index_files")
+        bundles.append(bundle)
+    return bundles
+
+
+def _iter_readable(
+    bundles: list[Bundle],
+    *,
+    log: structlog.stdlib.BoundLogger,
+    stats: ProcessingStats,
+) -> Iterable[tuple[Path, FrontMatterBlock | None]]:
+    for bundle in bundles:
+        index_md = bundle.index_md
+        stats.files_processed += 1
+        if isinstance(bundle.error, OSError):
+            stats.errors.append(f"{index_md}: failed to read ({bundle.error})")
+            log.error(
+                "failed to read file", path=str(index_md), error=str(bundle.error)
+            )
+            continue
+        if bundle.error is not None:
+            stats.errors.append(f"{index_md}: front matter error ({bundle.error})")
+            log.error(
+                "front matter parse error", path=str(index_md), error=str(bundle.error)
+            )
+            continue
+        yield index_md, bundle.front_matter
+
+
+def convert_images(
+    bundles: list[Bundle],
+    *,
+    repo_root: Path,
+    options: EncodeOptions,
+    jobs: int,
+    memory_budget_mb: int,
+    log: structlog.stdlib.BoundLogger,
+    stats: ProcessingStats,
+) -> None:
+    updated = convert_bundles(
+        _iter_readable(bundles, log=log, stats=stats),
+        repo_root=repo_root,
+        options=options,
+        jobs=jobs,
+        log=log,
+        stats=stats,
+        memory_budget_mb=memory_budget_mb,
+    )
+    for bundle in bundles:
+        front_matter = updated.get(bundle.index_md)
+        if front_matter is not None:
+            bundle.front_matter = front_matter
+
+
+def iter_tool_entry_sources(
+    bundles: Iterable[Bundle], *, tools_root: Path, history: GitHistoryIndex
+) -> Iterable[ToolEntrySource]:
+    for bundle in bundles:
+        if not bundle.index_md.is_relative_to(tools_root):
+            continue
+        if bundle.error is not None:
+            bundle.error.add_note(f"while reading front matter from {bundle.index_md}")
+            raise bundle.error
+        rel_dir = bundle.index_md.parent.relative_to(tools_root)
+        front_matter = bundle.front_matter
+        yield ToolEntrySource(
+            index_md=bundle.index_md,
+            rel_dir=rel_dir,
+            front_matter=front_matter.block_text if front_matter else None,
+            commits=history.lookup(rel_dir.as_posix()),
+            parsed=front_matter.data if front_matter else {},
+        )
+
+
+def _parse_args(argv: Sequence[str] | None) -> argparse.Namespace:
+    repo_root = Path(__file__).resolve().parents[1]
+    parser = argparse.ArgumentParser(
+        description="Convert images, build data/tools.yaml and summarize changes in one pass.",
+    )
+    parser.add_argument(
+        "--quality",
+        type=int,
+        default=80,
+        help="WebP quality setting (1-100).",
+    )
+    parser.add_argument(
+        "--skip-images",
+        action="store_true",
+        help="Do not convert images; only build the tools data.",
+    )
+    parser.add_argument(
+        "--max-dimension",
+        type=int,
+        help="Downscale images whose longer side exceeds N pixels while decoding.",
+    )
+    parser.add_argument(
+        "--memory-budget-mb",
+        type=int,
+        default=MEMORY_BUDGET_MB,
+        help="Estimated decode memory image workers may use at once.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=repo_root / ".cache" / "tools-data",
+        help="Directory for the incremental tool entry cache.",
+    )
+    parser.add_argument(
+        "--image-cache-dir",
+        type=Path,
+        default=repo_root / ".cache" / "webp",
+        help="Content-addressed cache of encoded images.",
+    )
+    parser.add_argument(
+        "--image-cache-max-mb",
+        type=int,
+        default=512,
+        help="Evict least recently used image cache entries above this size.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Rebuild everything and do not read or write either cache.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Encode images and build tool entries in N worker processes (0 = one per CPU).",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        type=Path,
+        help="Write phase timings and counters (.json, else OpenMetrics text).",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        help="Dump cProfile stats for the pipeline to this file.",
+    )
+    # Image conversion rewrites content, so a dry run makes no sense here.
+    parser.set_defaults(check=False)
+    args = parser.parse_args(argv)
+    if args.jobs < 0:
+        parser.error("--jobs must be 0 or a positive integer")
+    if args.jobs == 0:
+        args.jobs = os.cpu_count() or 1
+    if args.max_dimension is not None and args.max_dimension < 1:
+        parser.error("--max-dimension must be a positive integer")
+    if args.memory_budget_mb < 1:
+        parser.error("--memory-budget-mb must be a positive integer")
+    return args
+
+
+def _run(
+    args: argparse.Namespace,
+    *,
+    log: structlog.stdlib.BoundLogger,
+    metrics: Metrics,
+) -> int:
+    repo_root = Path(__file__).resolve().parents[1]
+    content_root = repo_root / "content"
+    tools_root = content_root / "tools"
+
+    bundles = load_bundles(content_root, metrics=metrics)
+
+    if not args.skip_images:
+        stats = ProcessingStats(metrics=metrics)
+        options = EncodeOptions(
+            quality=args.quality,
+            cache=None
+            if args.no_cache
+            else ContentCache(args.image_cache_dir, suffix=".webp"),
+            max_dimension=args.max_dimension,
+        )
+        convert_images(
+            bundles,
+            repo_root=repo_root,
+            options=options,
+            jobs=args.jobs,
+            memory_budget_mb=args.memory_budget_mb,
+            log=log,
+            stats=stats,
+        )
+        trim_cache(
+            options.cache, max_mb=args.image_cache_max_mb, log=log, metrics=metrics
+        )
+        metrics.count("files_processed", stats.files_processed)
+        metrics.count("errors", len(stats.errors))
+        log.info(
+            "conversion complete",
+            files_processed=stats.files_processed,
+            images_converted=stats.images_converted,
+            svg_bytes_saved=metrics.counters.get("svg_bytes_saved", 0),
+            errors=len(stats.errors),
+        )
+        for message in stats.errors:
+            log.warning("conversion issue", detail=message)
+
+    with metrics.phase("git_history"):
+        history = build_git_history_index(tools_root)
+    metrics.count("git_subprocesses", history.subprocess_count)
+    sources = iter_tool_entry_sources(bundles, tools_root=tools_root, history=history)
+    return build_and_write(
+        args, log=log, metrics=metrics, history=history, sources=sources
+    )
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = _parse_args(argv)
+    log = configure_logging("ci.pipeline")
+
+    try:
+        validate_quality(args.quality)
+    except ValueError as exc:
+        log.error("invalid arguments", error=str(exc))
+        return 2
+
+    metrics = Metrics("pipeline")
+    try:
+        with profile_to(args.profile):
+            return _run(args, log=log, metrics=metrics)
+    finally:
+        metrics.emit(log)
+        if args.metrics_out:
+            metrics.write(args.metrics_out)
+            log.info("wrote metrics", path=str(args.metrics_out))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+from common.cas import ContentCache
+from common.log import configure_logging
+from convert_page_images import (
+    EncodeOptions,
+    ProcessingStats,
+    convert_bundles,
+    minify_svgs,
+    parse_front_matter,
+    write_variant_manifest,
+)
+
+PIL = pytest.importorskip("PIL.Image")
+
+
+def _bundle(root: Path, slug: str, image: str) -> Path:
+    index_md = root / "content" / "tools" / "html" / slug / "index.md"
+    index_md.parent.mkdir(parents=True)
+    index_md.write_text(
+        f"---\ntitle: {slug}\nimages:\n  - src: {image}\n---\n", encoding="utf-8"
+    )
+    return index_md
+
+
+def _png(path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    PIL.new("RGB", (8, 8), "red").save(path)
+
+
+def _convert(repo: Path, index_files: list[Path], **kwargs) -> ProcessingStats:
+    log = configure_logging("test")
+    stats = ProcessingStats()
+    convert_bundles(
+        [(path, parse_front_matter(path)) for path in index_files],
+        repo_root=repo,
+        options=EncodeOptions(quality=80),
+        jobs=1,
+        log=log,
+        stats=stats,
+        **kwargs,
+    )
+    return stats
+
+
+def test_selection_keeps_original_shared_with_other_page(repo: Path) -> None:
+    owner = _bundle(repo, "owner", "images/s.png")
+    other = _bundle(repo, "other", "/content/tools/html/owner/images/s.png")
+    original = owner.parent / "images" / "s.png"
+    _png(original)
+
+    stats = _convert(repo, [other], reference_root=repo / "content")
+
+    assert not stats.errors
+    assert original.with_suffix(".webp").exists()
+    assert original.exists(), "still referenced by the unselected owner page"
+    assert "s.png" in owner.read_text(encoding="utf-8")
+    assert "s.webp" in other.read_text(encoding="utf-8")
+
+    # Once the owner is converted too, nothing references the original.
+    stats = _convert(repo, [owner], reference_root=repo / "content")
+
+    assert not stats.errors
+    assert not original.exists()
+
+
+def test_selection_deletes_unshared_original(repo: Path) -> None:
+    owner = _bundle(repo, "owner", "images/s.png")
+    _bundle(repo, "other", "images/s.png")
+    original = owner.parent / "images" / "s.png"
+    _png(original)
+    _png(repo / "content" / "tools" / "html" / "other" / "images" / "s.png")
+
+    _convert(repo, [owner], reference_root=repo / "content")
+
+    assert not original.exists()
+    assert (repo / "content" / "tools" / "html" / "other" / "images" / "s.png").exists()
+
+
+def test_shared_image_variants_are_relative_to_their_bundle(repo: Path) -> None:
+    owner = _bundle(repo, "owner", "images/s.png")
+    # Committed after the owner, so its entry would win if it depended on
+    # how the page names the image.
+    _bundle(repo, "zother", "/content/tools/html/owner/images/s.png")
+    original = owner.parent / "images" / "s.png"
+    original.parent.mkdir()
+    PIL.new("RGB", (64, 32), "red").save(original)
+    content = repo / "content"
+    log = configure_logging("test")
+    stats = ProcessingStats()
+
+    convert_bundles(
+        [
+            (path, parse_front_matter(path))
+            for path in sorted(content.rglob("index.md"))
+        ],
+        repo_root=repo,
+        options=EncodeOptions(quality=80, widths=(16, 32)),
+        jobs=1,
+        log=log,
+        stats=stats,
+    )
+    manifest = repo / "data" / "image_variants.json"
+    write_variant_manifest(manifest, stats.variants, content_root=content, log=log)
+
+    images = json.loads(manifest.read_text(encoding="utf-8"))["images"]
+    assert images == {
+        "tools/html/owner/images/s.webp": {
+            "width": 64,
+            "height": 32,
+            "variants": [
+                {"src": "images/s-16w.webp", "width": 16},
+                {"src": "images/s-32w.webp", "width": 32},
+            ],
+        }
+    }
+
+
+def test_minified_svg_is_not_rewritten(tmp_path: Path) -> None:
+    svg = tmp_path / "bundle" / "icon.svg"
+    svg.parent.mkdir()
+    svg.write_text(
+        '<?xml version="1.0"?>\n<!-- icon -->\n'
+        '<svg xmlns="http://www.w3.org/2000/svg" width="8" height="8">\n'
+        '    <rect width="8" height="8" />\n</svg>\n',
+        encoding="utf-8",
+    )
+    options = EncodeOptions(quality=80, cache=ContentCache(tmp_path / "cache"))
+    log = configure_logging("test")
+    index_md = svg.parent / "index.md"
+
+    minify_svgs({svg: index_md}, options=options, log=log, stats=ProcessingStats())
+    minified = svg.read_bytes()
+    os.utime(svg, ns=(0, 0))
+    stats = ProcessingStats()
+    minify_svgs({svg: index_md}, options=options, log=log, stats=stats)
+
+    assert svg.read_bytes() == minified
+    assert svg.stat().st_mtime_ns == 0
+    assert stats.metrics.counters["svg_cache_hits"] == 1
+
+
+def test_variant_manifest_accepts_relative_and_outside_paths(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    content = tmp_path / "content"
+    image = content / "tools" / "html" / "owner" / "images" / "s.webp"
+    outside = tmp_path / "static" / "logo.webp"
+    for path in (image, outside):
+        path.parent.mkdir(parents=True)
+        path.write_bytes(b"")
+    entry = {"width": 64, "height": 32, "variants": []}
+    manifest = tmp_path / "data" / "image_variants.json"
+    # Pre-commit passes paths relative to the repository root.
+    monkeypatch.chdir(tmp_path)
+
+    write_variant_manifest(
+        manifest,
+        {image.relative_to(tmp_path): entry, outside.relative_to(tmp_path): entry},
+        content_root=Path("content"),
+        log=configure_logging("test"),
+    )
+
+    images = json.loads(manifest.read_text(encoding="utf-8"))["images"]
+    assert images == {"tools/html/owner/images/s.webp": entry}
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import os
+import stat
+from pathlib import Path
+
+from common.files import atomic_write_text
+
+
+def _mode(path: Path) -> int:
+    return stat.S_IMODE(path.stat().st_mode)
+
+
+def test_atomic_write_keeps_existing_mode(tmp_path: Path) -> None:
+    path = tmp_path / "tools.yaml"
+    path.write_text("old\n", encoding="utf-8")
+    path.chmod(0o640)
+
+    atomic_write_text(path, "new\n")
+
+    assert path.read_text(encoding="utf-8") == "new\n"
+    assert _mode(path) == 0o640
+
+
+def test_atomic_write_new_file_follows_umask(tmp_path: Path) -> None:
+    path = tmp_path / "data" / "tools.yaml"
+    umask = os.umask(0o022)
+    try:
+        atomic_write_text(path, "new\n")
+    finally:
+        os.umask(umask)
+
+    assert _mode(path) == 0o644
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+from common.git import build_git_history_index
+
+
+def _git(repo: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", *args], cwd=repo, check=False, text=True, capture_output=True
+    ).stdout.strip()
+
+
+def _commit(repo: Path, message: str, **files: str) -> str:
+    for name, text in files.items():
+        path = repo / "tools" / name / "index.md"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", message)
+    return _git(repo, "rev-parse", "HEAD")
+
+
+def test_history_index_counts_conflict_resolving_merge(repo: Path) -> None:
+    init = _commit(repo, "init", a="1", b="1", c="1")
+    main = _git(repo, "branch", "--show-current")
+    _git(repo, "checkout", "-q", "-b", "side")
+    side = _commit(repo, "side", a="side", b="side")
+    _git(repo, "checkout", "-q", main)
+    ours = _commit(repo, "main", a="main", c="main")
+    _git(repo, "merge", "-q", "side")
+    merge = _commit(repo, "merge", a="resolved")
+
+    index = build_git_history_index(repo / "tools")
+
+    assert index.lookup("a") == (init, merge)
+    # Clean merges do not count: each directory matches one of the parents.
+    assert index.lookup("b") == (init, side)
+    assert index.lookup("c") == (init, ours)
+
+
+def test_history_index_counts_moves_for_both_directories(repo: Path) -> None:
+    _commit(repo, "init", a="1", b="1")
+    (repo / "tools" / "a" / "extra.txt").write_text("moved\n", encoding="utf-8")
+    _commit(repo, "add extra")
+    _git(repo, "mv", "tools/a/extra.txt", "tools/b/extra.txt")
+    moved = _commit(repo, "move extra")
+
+    index = build_git_history_index(repo / "tools")
+
+    assert index.lookup("a")[1] == moved
+    assert index.lookup("b")[1] == moved
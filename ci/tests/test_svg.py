@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import xml.etree.ElementTree as ET
+
+from common.svg import minify_svg
+
+
+def test_minify_keeps_document_prefixes_without_registering_them() -> None:
+    before = dict(vars(ET)["_namespace_map"])
+    data = (
+        b'<svg xmlns="http://www.w3.org/2000/svg"'
+        b' xmlns:xlink="http://www.w3.org/1999/xlink">\n'
+        b'    <use xlink:href="#a" />\n</svg>\n'
+    )
+
+    assert minify_svg(data) == (
+        b'<svg xmlns="http://www.w3.org/2000/svg"'
+        b' xmlns:xlink="http://www.w3.org/1999/xlink"><use xlink:href="#a"/></svg>'
+    )
+    assert vars(ET)["_namespace_map"] == before
+    # Other ElementTree users still get the usual generated prefix.
+    element = ET.Element("{http://www.w3.org/2000/svg}svg")
+    assert ET.tostring(element) == b'<ns0:svg xmlns:ns0="http://www.w3.org/2000/svg" />'
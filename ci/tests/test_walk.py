@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from common.walk import bundle_index_for
+
+
+def test_bundle_index_for_stops_at_root(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    root = tmp_path / "content"
+    bundle = root / "tools" / "html" / "a"
+    (bundle / "images").mkdir(parents=True)
+    (bundle / "index.md").write_text("---\n---\n", encoding="utf-8")
+    # An index.md above the root is not a bundle the walk may return.
+    (tmp_path / "index.md").write_text("", encoding="utf-8")
+    (root / "stray.txt").write_text("", encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+
+    image = Path("content/tools/html/a/images/s.png")
+    assert bundle_index_for(image, root=root) == Path("content/tools/html/a/index.md")
+    assert bundle_index_for(bundle / "index.md", root=root) == bundle / "index.md"
+    assert bundle_index_for(root / "stray.txt", root=root) is None
+    assert bundle_index_for(tmp_path / "index.md", root=root) is None
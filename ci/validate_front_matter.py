@@ -0,0 +1,283 @@
+#!/usr/bin/env -S uv run
+# /// script
+# requires-python = ">=3.14"
+# dependencies = [
+#   "structlog>=24.0.0",
+#   "PyYAML>=6.0.0",
+# ]
+# ///
+"""Check tool bundle front matter against `TOOL_SCHEMA`.
+
+`ci/build_tools_data.py` quietly falls back to defaults for bad fields (a
+missing title becomes "", a scalar `tags` a one-tag list, a missing tool
+file `tool.html`), so mistakes only show on the rendered site. This reports
+all of them in one run and exits 1 if there are any.
+
+The schema is compiled once into per-field checks; bundles are checked in
+worker processes with `--jobs`. Drafts and `toolbox.ignore` bundles only get
+the checks that decide whether they are published.
+
+Usage:
+    uv run ci/validate_front_matter.py
+    uv run ci/validate_front_matter.py --jobs 0
+    uv run ci/validate_front_matter.py content/tools/html/tool-slug/index.md
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Sequence
+
+from common.front_matter import (
+    FrontMatterError,
+    parse_front_matter_text,
+    read_front_matter_text,
+)
+from common.log import configure_logging
+from common.metrics import Metrics, profile_to
+from common.tools import tool_file, toolbox_section
+from common.walk import bundle_index_for, iter_bundle_index_files
+
+
+@dataclass(frozen=True)
+class Field:
+    """Schema for one front matter key.
+
+    `items` constrains list elements; `non_empty` rejects blank strings and
+    empty lists.
+    """
+
+    types: tuple[type, ...]
+    required: bool = False
+    non_empty: bool = False
+    items: tuple[type, ...] | None = None
+
+
+TOOL_SCHEMA: dict[str, Field] = {
+    "title": Field((str,), required=True, non_empty=True),
+    "description": Field((str,), required=True, non_empty=True),
+    "date": Field((dt.date, str)),
+    "draft": Field((bool,)),
+    "tags": Field((list,), items=(str,)),
+    "resources": Field((list,), items=(dict,)),
+    "toolbox": Field((dict,)),
+}
+
+TOOLBOX_SCHEMA: dict[str, Field] = {
+    "file": Field((str,), non_empty=True),
+    "ignore": Field((bool,)),
+}
+
+RESOURCE_SCHEMA: dict[str, Field] = {
+    "name": Field((str,), required=True, non_empty=True),
+    "src": Field((str,), required=True, non_empty=True),
+}
+
+# Below this many bundles, starting worker processes costs more than it saves.
+PARALLEL_MIN_BUNDLES = 256
+
+# (key, message) for each problem found.
+Problems = list[tuple[str, str]]
+Check = Callable[[dict[str, Any], str, Problems], None]
+
+
+def _type_names(types: tuple[type, ...]) -> str:
+    names = {dt.date: "date", dict: "mapping"}
+    return " or ".join(names.get(t, t.__name__) for t in types)
+
+
+def _field_check(key: str, spec: Field) -> Check:
+    expected = _type_names(spec.types)
+    item_expected = _type_names(spec.items) if spec.items else ""
+
+    def check(data: dict[str, Any], prefix: str, problems: Problems) -> None:
+        name = prefix + key
+        if key not in data or data[key] is None:
+            if spec.required:
+                problems.append((name, "is required"))
+            return
+        value = data[key]
+        # bool is an int; a schema asking for int must not accept True.
+        if not isinstance(value, spec.types) or (
+            isinstance(value, bool) and bool not in spec.types
+        ):
+            problems.append((name, f"must be a {expected}, got {value!r}"))
+            return
+        if spec.non_empty and not (value.strip() if isinstance(value, str) else value):
+            problems.append((name, "must not be empty"))
+        if spec.items:
+            for index, item in enumerate(value):
+                if not isinstance(item, spec.items) or (
+                    isinstance(item, str) and not item.strip()
+                ):
+                    problems.append(
+                        (f"{name}[{index}]", f"must be a {item_expected}, got {item!r}")
+                    )
+
+    return check
+
+
+def compile_schema(schema: dict[str, Field]) -> Callable[..., Problems]:
+    """Turn `schema` into one function checking a mapping against all its fields."""
+
+    checks = [_field_check(key, spec) for key, spec in schema.items()]
+
+    def validate(data: dict[str, Any], *, prefix: str = "") -> Problems:
+        problems: Problems = []
+        for check in checks:
+            check(data, prefix, problems)
+        return problems
+
+    return validate
+
+
+_validate_tool = compile_schema(TOOL_SCHEMA)
+_validate_toolbox = compile_schema(TOOLBOX_SCHEMA)
+_validate_resource = compile_schema(RESOURCE_SCHEMA)
+
+
+def _is_local(src: str) -> bool:
+    return "://" not in src and not src.startswith(("/", "data:"))
+
+
+def validate_front_matter(fm: dict[str, Any], bundle_dir: Path) -> Problems:
+    """Every problem with the front matter of the bundle in `bundle_dir`."""
+
+    problems = _validate_tool(fm)
+    if "tool" in fm:
+        problems.append(("tool", "is a legacy alias; rename it to `toolbox`"))
+    toolbox = toolbox_section(fm)
+    problems += _validate_toolbox(toolbox, prefix="toolbox.")
+    if fm.get("draft") is True or toolbox.get("ignore") is True:
+        return problems
+
+    resources = fm.get("resources")
+    if isinstance(resources, list):
+        for index, item in enumerate(resources):
+            if not isinstance(item, dict):
+                continue
+            found = _validate_resource(item, prefix=f"resources[{index}].")
+            problems += found
+            src = item.get("src")
+            if not found and _is_local(src) and not (bundle_dir / src).is_file():
+                problems.append((f"resources[{index}].src", f"{src} does not exist"))
+
+    path = tool_file(fm, toolbox)
+    if _is_local(path) and not (bundle_dir / path).is_file():
+        problems.append(("tool file", f"{path} does not exist in the bundle"))
+    return problems
+
+
+def validate_bundle(index_md: Path) -> tuple[Path, Problems]:
+    try:
+        front_matter = read_front_matter_text(index_md)
+        fm = parse_front_matter_text(front_matter.block_text if front_matter else "")
+    except (OSError, FrontMatterError) as exc:
+        return index_md, [("front matter", str(exc))]
+    return index_md, validate_front_matter(fm, index_md.parent)
+
+
+def validate_bundles(
+    index_files: list[Path], *, jobs: int
+) -> Iterable[tuple[Path, Problems]]:
+    """Results in input order, from `jobs` worker processes when there are many."""
+
+    if jobs <= 1 or len(index_files) < PARALLEL_MIN_BUNDLES:
+        return map(validate_bundle, index_files)
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = max(1, len(index_files) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(validate_bundle, index_files, chunksize=chunksize))
+
+
+def _parse_args(argv: Sequence[str] | None) -> argparse.Namespace:
+    repo_root = Path(__file__).resolve().parents[1]
+    parser = argparse.ArgumentParser(
+        description="Validate content/tools/**/index.md front matter.",
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        type=Path,
+        help="index.md files, or files inside tool bundles (as passed by pre-commit).",
+    )
+    parser.add_argument(
+        "--root",
+        type=Path,
+        default=repo_root / "content" / "tools",
+        help="Tools root to walk when no paths are given (default: content/tools).",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Check bundles in N worker processes (0 = one per CPU).",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        type=Path,
+        help="Write phase timings and counters (.json, else OpenMetrics text).",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        help="Dump cProfile stats for the run to this file.",
+    )
+    args = parser.parse_args(argv)
+    if args.jobs < 0:
+        parser.error("--jobs must be 0 or a positive integer")
+    if args.jobs == 0:
+        args.jobs = os.cpu_count() or 1
+    return args
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = _parse_args(argv)
+    log = configure_logging("ci.validate_front_matter")
+    metrics = Metrics("validate_front_matter")
+    started = time.perf_counter()
+
+    try:
+        with profile_to(args.profile):
+            if args.paths:
+                found = {bundle_index_for(path, root=args.root) for path in args.paths}
+                index_files = sorted(path for path in found if path is not None)
+            else:
+                index_files = list(
+                    metrics.timed_iter("walk", iter_bundle_index_files(args.root))
+                )
+            errors = 0
+            with metrics.phase("validate"):
+                for index_md, problems in validate_bundles(index_files, jobs=args.jobs):
+                    for key, message in problems:
+                        log.error(
+                            "invalid front matter",
+                            path=str(index_md),
+                            field=key,
+                            error=message,
+                        )
+                    errors += len(problems)
+            metrics.count("bundles", len(index_files))
+            metrics.count("errors", errors)
+            log.info(
+                "validated front matter",
+                bundles=len(index_files),
+                errors=errors,
+                elapsed_ms=round((time.perf_counter() - started) * 1000, 1),
+            )
+            return 1 if errors else 0
+    finally:
+        if args.metrics_out:
+            metrics.emit(log)
+            metrics.write(args.metrics_out)
+            log.info("wrote metrics", path=str(args.metrics_out))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())